@@ -1,13 +1,33 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
-from scipy import stats
-import plotly.express as px
-import plotly.graph_objects as go
-from io import BytesIO
+import pandas as pd
+from pathlib import Path
+import os
+import tempfile
+import time
+from concurrent.futures import as_completed
+
+# El análisis vive en dca_papa; SciPy y Plotly se cargan solo cuando una página los usa
+from dca_papa.almacen import AlmacenResultados, directorio_por_defecto
+from dca_papa.anova import anova_multirespuesta, anova_multirespuesta_anidado, calcular_anova, tabla_anova
+from dca_papa.archivos import anova_por_bloques, detectar_formato
+from dca_papa.bifactorial import anova_bifactorial_desde_celdas, estadisticos_por_celda, tabla_anova_bifactorial
+from dca_papa.cache import CacheLRU
+from dca_papa.datos import (CONFIGS_BIFACTORIAL, CONFIGS_MODELOS, DISENOS_ANIDADOS, agregar_ids, clave_modelo,
+                            generar_datos_bifactorial, generar_datos_modelo, obtener_datos_bifactorial,
+                            obtener_datos_modelo)
+from dca_papa.exportar import exportar_resultados
+from dca_papa.incremental import AnovaIncremental
+from dca_papa.perfil import PERFILADOR, medir, memoria_proceso
+from dca_papa.graficos import figura_cajas, figura_interaccion, figura_medias, figura_puntos, resumen_cajas
+from dca_papa.potencia import escalar_diferencias, simular_potencia
+from dca_papa.remuestreo import anova_remuestreo, medias_por_lote
+from dca_papa.trabajos import ColaTrabajos
+from dca_papa.tukey import calcular_tukey, tukey_desde_estadisticos
 
 # Configuración de la página
 st.set_page_config(page_title="🥔 DCA Papa - Fertilización", layout="wide", page_icon="🥔", initial_sidebar_state="expanded")
+inicio_pagina = time.perf_counter()
 
 # CSS personalizado - Diseño TIPO DASHBOARD
 st.markdown("""
@@ -97,7 +117,7 @@ with st.sidebar:
     st.markdown("### 🎯 Navegación Principal")
     pagina = st.radio(
         "Seleccione:",
-        ["🏠 Dashboard", "📊 Análisis por Modelo", "📈 Comparativa Global", "ℹ️ Información"],
+        ["🏠 Dashboard", "📊 Análisis por Modelo", "🧬 Bifactorial", "📈 Comparativa Global", "📂 Archivo de Campo", "⚡ Potencia", "📝 Captura en Campo", "ℹ️ Información"],
         label_visibility="collapsed"
     )
     
@@ -121,72 +141,142 @@ with st.sidebar:
     </div>
     """, unsafe_allow_html=True)
 
-# Funciones de generación de datos (mismas)
-def generar_datos_modelo(semilla, medias, desv, n_dict=None):
-    np.random.seed(semilla)
-    datos = []
-    
-    if n_dict is None:
-        n_dict = {t: 15 for t in medias.keys()}
-    
-    for trat in medias.keys():
-        for i in range(n_dict[trat]):
-            rendimiento = np.random.normal(medias[trat], desv[trat])
-            datos.append({
-                "ID": f"{trat}-{i+1:03d}",
-                "Tratamiento": trat,
-                "Rendimiento_kg_ha": round(rendimiento, 1)
-            })
-    return pd.DataFrame(datos)
-
-def obtener_datos_modelo(numero):
-    configs = {
-        1: (100, {"T1": 32000, "T2": 28000, "T3": 35000, "T4": 30000}, 
-            {"T1": 2500, "T2": 2800, "T3": 2200, "T4": 2600}, None),
-        2: (200, {"T1": 31500, "T2": 29000, "T3": 36000, "T4": 31000},
-            {"T1": 3000, "T2": 2900, "T3": 2400, "T4": 2700},
-            {"T1": 14, "T2": 18, "T3": 16, "T4": 20}),
-        3: (300, {"T1": 32500, "T2": 28500, "T3": 35500, "T4": 30500},
-            {"T1": 2000, "T2": 2200, "T3": 1800, "T4": 2100}, None),
-        4: (400, {"T1": 31800, "T2": 29500, "T3": 36500, "T4": 31500},
-            {"T1": 2100, "T2": 2300, "T3": 1900, "T4": 2200}, None),
-        5: (500, {"T1": 32200, "T2": 28800, "T3": 35800, "T4": 30800},
-            {"T1": 2050, "T2": 2250, "T3": 1850, "T4": 2150}, None),
-        6: (600, {"T1": 31000, "T2": 30000, "T3": 37000, "T4": 32000},
-            {"T1": 2300, "T2": 2500, "T3": 2000, "T4": 2400}, None)
-    }
-    return generar_datos_modelo(*configs[numero])
+# Funciones de la interfaz: el análisis está en el paquete dca_papa
 
-def calcular_anova_simple(df):
-    grupos = [df[df['Tratamiento'] == t]['Rendimiento_kg_ha'].values 
-              for t in df['Tratamiento'].unique()]
-    f_stat, p_value = stats.f_oneway(*grupos)
-    
-    n_total = len(df)
-    k = len(df['Tratamiento'].unique())
-    grand_mean = df['Rendimiento_kg_ha'].mean()
-    
-    ss_total = ((df['Rendimiento_kg_ha'] - grand_mean) ** 2).sum()
-    ss_between = sum([len(df[df['Tratamiento'] == t]) * 
-                      (df[df['Tratamiento'] == t]['Rendimiento_kg_ha'].mean() - grand_mean) ** 2 
-                      for t in df['Tratamiento'].unique()])
-    ss_within = ss_total - ss_between
+# Caché de resultados compartida entre reruns y sesiones; detrás, un almacén en disco
+# compartido por todos los procesos del servidor (una réplica nueva arranca con resultados)
+DIR_ALMACEN = Path(os.environ.get('DCA_PAPA_ALMACEN') or directorio_por_defecto())
+MAX_MB_ALMACEN = int(os.environ.get('DCA_PAPA_ALMACEN_MB', 2048))
+
+@st.cache_resource
+def obtener_almacen():
+    return AlmacenResultados(DIR_ALMACEN / "resultados.sqlite", max_bytes=MAX_MB_ALMACEN * 1024 ** 2)
+
+@st.cache_resource
+def obtener_cache_resultados():
+    # cache_resource mantiene un único objeto por proceso del servidor
+    return CacheLRU(max_entradas=64, respaldo=obtener_almacen())
+
+# Pool de trabajos compartido: generación, análisis y exportación fuera del hilo de la página,
+# con un solo cálculo aunque varias sesiones pidan lo mismo a la vez
+@st.cache_resource
+def obtener_cola_trabajos():
+    trabajadores = os.environ.get('DCA_PAPA_TRABAJADORES')
+    return ColaTrabajos(int(trabajadores) if trabajadores else None)
+
+def datos_modelo_cache(numero):
+    return obtener_cache_resultados().obtener(
+        ('datos', clave_modelo(numero)), lambda: obtener_datos_modelo(numero))
+
+def anova_modelo_cache(numero):
+    return obtener_cache_resultados().obtener(
+        ('anova', clave_modelo(numero)), lambda: calcular_anova(datos_modelo_cache(numero)))
+
+def multirespuesta_modelo_cache(numero):
+    def calcular():
+        df = datos_modelo_cache(numero)
+        respuestas = list(df.select_dtypes('number').columns)
+        # Con submuestreo, el mismo ANOVA (error de lotes) que la tabla de la página y del modelo
+        if 'Lote' in df.columns:
+            return anova_multirespuesta_anidado(df, respuestas)
+        return anova_multirespuesta(df, respuestas)
+    return obtener_cache_resultados().obtener(('multirespuesta', clave_modelo(numero)), calcular)
+
+def resumen_modelo_cache(numero):
+    def calcular():
+        df = datos_modelo_cache(numero)
+        with medir('estadisticos.groupby'):
+            resumen = df.groupby('Tratamiento', observed=True)['Rendimiento_kg_ha'].agg(['count', 'mean', 'std'])
+        resumen.columns = ['n', 'Media', 'DE']
+        return resumen
+    return obtener_cache_resultados().obtener(('resumen', clave_modelo(numero)), calcular)
+
+def tukey_modelo_cache(numero):
+    return obtener_cache_resultados().obtener(
+        ('tukey', clave_modelo(numero)),
+        lambda: calcular_tukey(datos_modelo_cache(numero), anova_modelo_cache(numero)))
+
+def mostrar_anova(anova):
+    col1, col2 = st.columns(2)
     
-    df_between = k - 1
-    df_within = n_total - k
+    with col1:
+        st.markdown("#### 📊 Tabla ANOVA")
+        anova_table = tabla_anova(anova)
+        st.dataframe(anova_table, use_container_width=True, hide_index=True)
     
-    ms_between = ss_between / df_between
-    ms_within = ss_within / df_within
+    with col2:
+        st.markdown("#### 🎯 Resultado")
+        if anova['P'] < 0.05:
+            st.success("✅ **SIGNIFICATIVO**")
+            st.write(f"p-valor = {anova['P']:.4f} < 0.05")
+            st.write("Existen diferencias entre tratamientos")
+        else:
+            st.warning("⚠️ **NO SIGNIFICATIVO**")
+            st.write(f"p-valor = {anova['P']:.4f} ≥ 0.05")
+        
+        st.markdown("#### 📊 Estadístico F")
+        st.metric("Valor F", f"{anova['F']:.3f}")
     
-    return {
-        'F': f_stat, 'P': p_value, 'SS_B': ss_between, 'SS_W': ss_within,
-        'SS_T': ss_total, 'DF_B': df_between, 'DF_W': df_within,
-        'MS_B': ms_between, 'MS_W': ms_within
-    }
+    return anova_table
+
+def mostrar_tukey(tukey):
+    st.markdown("#### 🔬 Prueba de Tukey HSD")
+    st.caption(f"α = {tukey['alfa']} | q crítico = {tukey['q_critico']:.3f} · "
+               "Medias con la misma letra no difieren significativamente")
+    st.dataframe(tukey['grupos'].round({'Media': 1}), use_container_width=True, hide_index=True)
+    
+    with st.expander(f"📋 Comparaciones por pares ({len(tukey['comparaciones'])})"):
+        st.dataframe(tukey['comparaciones'].round({'Diferencia': 1, 'EE': 1, 'q': 3, 'HSD': 1}),
+                     use_container_width=True, hide_index=True)
+
+# Ensayos factoriales: los datos sintéticos grandes se identifican por sus parámetros
+ENSAYO_SINTETICO = "Sintético (grilla grande)"
+
+def datos_bifactorial_cache(ensayo, parametros=None):
+    if ensayo == ENSAYO_SINTETICO:
+        n_fert, n_var, max_parcelas = parametros
+        def generar():
+            rng = np.random.default_rng(900)
+            medias = {f"F{i + 1}": 30000 + 4000 * x for i, x in enumerate(rng.random(n_fert))}
+            efectos = {f"V{j + 1}": 2000 * x - 1000 for j, x in enumerate(rng.random(n_var))}
+            # Parcelas por celda variables: diseño no balanceado
+            n_celda = rng.integers(1, max_parcelas + 1, size=(n_fert, n_var))
+            return generar_datos_bifactorial(900, medias, efectos, 2500, n_celda, 800)
+        return obtener_cache_resultados().obtener(('bifactorial_datos', ensayo, parametros), generar)
+    return obtener_cache_resultados().obtener(
+        ('bifactorial_datos', ensayo, repr(CONFIGS_BIFACTORIAL[ensayo])), lambda: obtener_datos_bifactorial(ensayo))
+
+# Figuras por modelo (resúmenes calculados en el servidor)
+def figuras_modelo_cache(numero):
+    def construir():
+        resumen, atipicos = resumen_cajas(datos_modelo_cache(numero))
+        return figura_cajas(resumen, atipicos), figura_medias(resumen)
+    return obtener_cache_resultados().obtener(('figuras', clave_modelo(numero)), construir)
+
+# Exportación bajo demanda: se genera solo cuando se pide y se guarda en el almacén
+FORMATOS_EXPORTACION = {
+    "Excel (.xlsx)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "CSV comprimido (.csv.gz)": ("csv.gz", "application/gzip")
+}
+DIR_EXPORTACION = Path(tempfile.gettempdir()) / "dca_papa_exportes"
+
+def exportacion_modelo(numero, formato):
+    """Bytes del archivo de resultados del modelo (una sola generación por configuración y formato)."""
+    def generar():
+        DIR_EXPORTACION.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(dir=DIR_EXPORTACION) as directorio:
+            ruta = Path(directorio) / f"modelo_{numero}.{formato}"
+            hojas = {'ANOVA': tabla_anova(anova_modelo_cache(numero)),
+                     'Tukey': tukey_modelo_cache(numero)['grupos']}
+            exportar_resultados(ruta, datos_modelo_cache(numero), formato, hojas)
+            return ruta.read_bytes()
+    # Solo en el almacén en disco: los archivos pueden ser grandes para la caché en memoria
+    return obtener_almacen().obtener(('exportacion', clave_modelo(numero), formato), generar)
 
 # ==================== DASHBOARD PRINCIPAL ====================
 if pagina == "🏠 Dashboard":
-    
+
     # CARDS DE INFORMACIÓN
     cols = st.columns(4)
     
@@ -311,10 +401,11 @@ if pagina == "🏠 Dashboard":
 
 # ==================== ANÁLISIS POR MODELO ====================
 elif pagina == "📊 Análisis por Modelo":
-    
+
     num_modelo = int(modelo.split(":")[0][1])
-    df = obtener_datos_modelo(num_modelo)
-    anova = calcular_anova_simple(df)
+    df = datos_modelo_cache(num_modelo)
+    anova = anova_modelo_cache(num_modelo)
+    info_lotes = f" | 🧱 {df['Lote'].nunique()} lotes" if 'Lote' in df.columns else ""
     
     # HEADER DEL MODELO
     st.markdown(f"""
@@ -322,7 +413,7 @@ elif pagina == "📊 Análisis por Modelo":
                 padding: 20px 30px; border-radius: 12px; margin-bottom: 25px;'>
         <h2 style='color: white; margin: 0;'>{modelo}</h2>
         <p style='color: white; margin: 5px 0 0 0; opacity: 0.9;'>
-            📊 {len(df)} observaciones | 🧪 {df['Tratamiento'].nunique()} tratamientos
+            📊 {len(df)} observaciones | 🧪 {df['Tratamiento'].nunique()} tratamientos{info_lotes}
         </p>
     </div>
     """, unsafe_allow_html=True)
@@ -335,121 +426,432 @@ elif pagina == "📊 Análisis por Modelo":
         
         with col1:
             st.markdown("#### 📊 Tabla de Datos")
-            st.dataframe(df, use_container_width=True, height=400)
+            st.dataframe(agregar_ids(df), use_container_width=True, height=400)
         
         with col2:
             st.markdown("#### 📈 Estadísticas")
-            stats_df = df.groupby('Tratamiento')['Rendimiento_kg_ha'].agg(['count', 'mean', 'std']).round(1)
-            stats_df.columns = ['n', 'Media', 'DE']
-            st.dataframe(stats_df, use_container_width=True)
+            stats_df = resumen_modelo_cache(num_modelo)
+            st.dataframe(stats_df.round(1), use_container_width=True)
             
             st.markdown("#### 🎯 Resumen")
-            mejor = df.groupby('Tratamiento')['Rendimiento_kg_ha'].mean().idxmax()
-            mejor_val = df.groupby('Tratamiento')['Rendimiento_kg_ha'].mean().max()
+            mejor = stats_df['Media'].idxmax()
+            mejor_val = stats_df['Media'].max()
             st.success(f"**Mejor:** {mejor}")
             st.metric("Rendimiento", f"{mejor_val:.0f} kg/ha")
     
     with tab2:
-        col1, col2 = st.columns(2)
+        mostrar_anova(anova)
+        mostrar_tukey(tukey_modelo_cache(num_modelo))
         
+        st.markdown("#### 🎲 Pruebas por Remuestreo")
+        col1, col2, col3 = st.columns(3)
         with col1:
-            st.markdown("#### 📊 Tabla ANOVA")
-            anova_table = pd.DataFrame({
-                'Fuente': ['Tratamientos', 'Error', 'Total'],
-                'SC': [f"{anova['SS_B']:.1f}", f"{anova['SS_W']:.1f}", f"{anova['SS_T']:.1f}"],
-                'GL': [anova['DF_B'], anova['DF_W'], anova['DF_B'] + anova['DF_W']],
-                'CM': [f"{anova['MS_B']:.1f}", f"{anova['MS_W']:.1f}", '-'],
-                'F': [f"{anova['F']:.3f}", '-', '-'],
-                'P-valor': [f"{anova['P']:.4f}", '-', '-']
-            })
-            st.dataframe(anova_table, use_container_width=True, hide_index=True)
-        
+            n_perm = st.select_slider("Permutaciones", [1000, 5000, 10000, 50000, 100000], value=10000)
         with col2:
-            st.markdown("#### 🎯 Resultado")
-            if anova['P'] < 0.05:
-                st.success("✅ **SIGNIFICATIVO**")
-                st.write(f"p-valor = {anova['P']:.4f} < 0.05")
-                st.write("Existen diferencias entre tratamientos")
-            else:
-                st.warning("⚠️ **NO SIGNIFICATIVO**")
-                st.write(f"p-valor = {anova['P']:.4f} ≥ 0.05")
-            
-            st.markdown("#### 📊 Estadístico F")
-            st.metric("Valor F", f"{anova['F']:.3f}")
+            n_boot = st.select_slider("Réplicas bootstrap", [500, 1000, 2000, 5000, 10000], value=2000)
+        with col3:
+            nivel_ic = st.select_slider("Nivel del IC", [0.90, 0.95, 0.99], value=0.95)
+        
+        clave_remuestreo = ('remuestreo', clave_modelo(num_modelo), n_perm, n_boot, nivel_ic)
+        if st.button("🎲 Calcular p-valores por remuestreo"):
+            barra = st.progress(0.0, text="Remuestreando...")
+            datos_rem = medias_por_lote(df) if 'Lote' in df.columns else df
+            st.session_state['remuestreo'] = (clave_remuestreo, obtener_cache_resultados().obtener(
+                clave_remuestreo, lambda: anova_remuestreo(
+                    datos_rem, n_perm, n_boot, nivel_ic,
+                    progreso=lambda f, r: barra.progress(f, text=f"Remuestreando... {f:.0%} · quedan ~{r:.1f} s"))))
+            barra.empty()
+        
+        clave_guardada, remuestreo = st.session_state.get('remuestreo', (None, None))
+        if clave_guardada == clave_remuestreo:
+            if 'Lote' in df.columns:
+                st.caption("Diseño con submuestreo: se remuestrean las medias de lote (unidad experimental)")
+            cols = st.columns(3)
+            cols[0].metric("P paramétrico", f"{remuestreo['P_parametrico']:.4f}")
+            cols[1].metric(f"P permutación ({remuestreo['n_permutaciones']:,})", f"{remuestreo['P_permutacion']:.4f}")
+            cols[2].metric(f"P bootstrap ({remuestreo['n_bootstrap']:,})", f"{remuestreo['P_bootstrap']:.4f}")
+            st.dataframe(remuestreo['intervalos'].round(1), use_container_width=True, hide_index=True)
     
     with tab3:
+        fig1, fig2 = figuras_modelo_cache(num_modelo)
         # Gráfico de cajas horizontal
-        fig1 = px.box(df, y='Tratamiento', x='Rendimiento_kg_ha', 
-                      orientation='h',
-                      title='Distribución por Tratamiento',
-                      color='Tratamiento',
-                      color_discrete_sequence=['#66bb6a', '#4caf50', '#388e3c', '#2e7d32'])
-        fig1.update_layout(showlegend=False, height=400)
         st.plotly_chart(fig1, use_container_width=True)
         
         # Gráfico de promedios
-        medias = df.groupby('Tratamiento')['Rendimiento_kg_ha'].mean().reset_index()
-        fig2 = go.Figure(data=[
-            go.Bar(x=medias['Tratamiento'], y=medias['Rendimiento_kg_ha'],
-                   marker_color=['#66bb6a', '#4caf50', '#388e3c', '#2e7d32'])
-        ])
-        fig2.update_layout(title='Rendimiento Promedio', height=400,
-                          yaxis_title='Rendimiento (kg/ha)')
         st.plotly_chart(fig2, use_container_width=True)
+        
+        if st.checkbox("🔍 Mostrar parcelas individuales"):
+            st.plotly_chart(figura_puntos(df), use_container_width=True)
     
     with tab4:
         st.markdown("#### 💾 Descargar Resultados")
         
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, sheet_name='Datos', index=False)
-            anova_table.to_excel(writer, sheet_name='ANOVA', index=False)
+        formato_exp = st.radio("Formato:", list(FORMATOS_EXPORTACION), horizontal=True)
+        extension, mime = FORMATOS_EXPORTACION[formato_exp]
+        if extension != 'xlsx':
+            st.caption("Parquet y CSV.gz contienen la tabla de datos; Excel incluye además ANOVA y Tukey")
         
+        # El archivo se genera al hacer clic, no en cada rerun
         st.download_button(
-            "📥 Descargar Excel",
-            data=output.getvalue(),
-            file_name=f"modelo_{num_modelo}_resultados.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            f"📥 Descargar {formato_exp}",
+            data=lambda: obtener_cola_trabajos().enviar(
+                ('exportacion', clave_modelo(num_modelo), extension), exportacion_modelo, num_modelo, extension
+            ).result(),
+            file_name=f"modelo_{num_modelo}_resultados.{extension}",
+            mime=mime
         )
 
+# ==================== ANOVA BIFACTORIAL ====================
+elif pagina == "🧬 Bifactorial":
+
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, #4caf50, #66bb6a); 
+                padding: 20px 30px; border-radius: 12px; margin-bottom: 25px;'>
+        <h2 style='color: white; margin: 0;'>🧬 ANOVA Bifactorial: Fertilizante × Variedad</h2>
+        <p style='color: white; margin: 5px 0 0 0; opacity: 0.9;'>
+            Efectos principales e interacción; SC tipo I, II o III para diseños no balanceados
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        ensayo = st.selectbox("Ensayo:", list(CONFIGS_BIFACTORIAL) + [ENSAYO_SINTETICO])
+    with col2:
+        tipo_sc = st.radio("Suma de cuadrados:", ["Tipo I (secuencial)", "Tipo II", "Tipo III"],
+                           index=1, horizontal=True)
+    tipo = {"Tipo I (secuencial)": 1, "Tipo II": 2, "Tipo III": 3}[tipo_sc]
+    
+    parametros = None
+    if ensayo == ENSAYO_SINTETICO:
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            n_fert = st.slider("Fertilizantes", 2, 60, 30)
+        with col2:
+            n_var = st.slider("Variedades", 2, 60, 30)
+        with col3:
+            max_parcelas = st.slider("Máx. parcelas por celda", 2, 200, 50)
+        parametros = (n_fert, n_var, max_parcelas)
+    
+    df_bi = datos_bifactorial_cache(ensayo, parametros)
+    inicio = time.perf_counter()
+    fertilizantes, variedades, n_celda, medias, m2 = estadisticos_por_celda(df_bi)
+    anova_bi = anova_bifactorial_desde_celdas(n_celda, medias, m2, tipo)
+    ms_anova = (time.perf_counter() - inicio) * 1000
+    medias_celda = pd.DataFrame(medias, index=pd.Index(fertilizantes, name='Fertilizante'),
+                                columns=pd.Index(variedades, name='Variedad'))
+    
+    cols = st.columns(4)
+    cols[0].metric("Parcelas", f"{len(df_bi):,}")
+    cols[1].metric("Celdas", f"{len(fertilizantes)} × {len(variedades)}")
+    cols[2].metric("Balanceado", "Sí" if (n_celda == n_celda.flat[0]).all() else "No")
+    cols[3].metric("Tiempo ANOVA", f"{ms_anova:.1f} ms")
+    
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.markdown(f"#### 📊 Tabla ANOVA ({tipo_sc})")
+        st.dataframe(tabla_anova_bifactorial(anova_bi), use_container_width=True, hide_index=True)
+    with col2:
+        st.markdown("#### 🎯 Resultado")
+        for nombre, clave in [("Fertilizante", 'A'), ("Variedad", 'B'), ("Interacción", 'AB')]:
+            p_valor = anova_bi[f'P_{clave}']
+            if p_valor < 0.05:
+                st.success(f"✅ **{nombre}**: significativo (p = {p_valor:.4f})")
+            else:
+                st.warning(f"⚠️ **{nombre}**: no significativo (p = {p_valor:.4f})")
+        if anova_bi['P_AB'] < 0.05:
+            st.info("💡 Con interacción significativa conviene comparar fertilizantes dentro de cada variedad")
+    
+    st.plotly_chart(figura_interaccion(medias_celda), use_container_width=True)
+    
+    with st.expander("📋 Medias por celda (kg/ha)"):
+        st.dataframe(medias_celda.round(1), use_container_width=True)
+
 # ==================== COMPARATIVA GLOBAL ====================
 elif pagina == "📈 Comparativa Global":
-    
+
     st.markdown("""
     <div style='background: white; padding: 25px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
         <h2 style='color: #2e7d32; margin-top: 0;'>📈 Comparación entre Todos los Modelos</h2>
     """, unsafe_allow_html=True)
     
-    comparacion = []
-    for i in range(1, 7):
-        df = obtener_datos_modelo(i)
-        anova = calcular_anova_simple(df)
-        mejor = df.groupby('Tratamiento')['Rendimiento_kg_ha'].mean().idxmax()
-        
-        comparacion.append({
+    def analizar_modelo(i):
+        # Trabajo del pool: cada modelo se genera y analiza en paralelo con los demás
+        df = datos_modelo_cache(i)
+        anova = anova_modelo_cache(i)
+        fila = {
             'Modelo': f'M{i}',
             'n': len(df),
             'F-stat': round(anova['F'], 3),
             'P-valor': round(anova['P'], 4),
             'Significativo': '✅' if anova['P'] < 0.05 else '❌',
-            'Mejor Trat.': mejor
-        })
-    
-    comp_df = pd.DataFrame(comparacion)
-    st.dataframe(comp_df, use_container_width=True, hide_index=True)
+            'Mejor Trat.': resumen_modelo_cache(i)['Media'].idxmax()
+        }
+        return fila, multirespuesta_modelo_cache(i)[0].assign(Modelo=f'M{i}')
+    
+    cola = obtener_cola_trabajos()
+    futuros = {cola.enviar(('comparativa', clave_modelo(i)), analizar_modelo, i): i for i in range(1, 7)}
+    
+    # La tabla crece a medida que terminan los modelos
+    tabla_parcial = st.empty()
+    barra = st.progress(0.0, text="Analizando modelos...")
+    resultados = {}
+    for futuro in as_completed(futuros):
+        resultados[futuros[futuro]] = futuro.result()
+        comp_df = pd.DataFrame([resultados[i][0] for i in sorted(resultados)])
+        tabla_parcial.dataframe(comp_df, use_container_width=True, hide_index=True)
+        barra.progress(len(resultados) / len(futuros), text=f"Analizando modelos... {len(resultados)}/{len(futuros)}")
+    barra.empty()
+    
+    # Grilla modelos × respuestas: un ANOVA matricial por modelo cubre todas las variables
+    st.markdown("#### 🧬 Todas las Respuestas por Modelo")
+    tablas = [resultados[i][1] for i in range(1, 7)]
+    grilla = pd.concat(tablas, ignore_index=True)
+    vista = st.radio("Mostrar:", ["F", "P", "Mejor"], horizontal=True)
+    tabla_grilla = grilla.pivot(index='Modelo', columns='Respuesta', values=vista)[tablas[0]['Respuesta']]
+    if vista == "P":
+        tabla_grilla = tabla_grilla.map(lambda p: f"{p:.4f} {'✅' if p < 0.05 else '❌'}")
+    elif vista == "F":
+        tabla_grilla = tabla_grilla.round(3)
+    st.dataframe(tabla_grilla, use_container_width=True)
+    st.caption("M3–M5 (submuestreo) usan el ANOVA con submuestreo: el error es la variación entre lotes")
     
     # Gráfico comparativo
-    fig = px.bar(comp_df, x='Modelo', y='F-stat', 
-                 color='Significativo',
-                 color_discrete_map={'✅': '#4caf50', '❌': '#e57373'},
-                 title='Estadísticos F por Modelo')
+    import plotly.express as px
+    mapa = grilla.pivot(index='Modelo', columns='Respuesta', values='F')[tablas[0]['Respuesta']]
+    fig = px.imshow(mapa, text_auto='.1f', aspect='auto',
+                    color_continuous_scale=['#f1f8e9', '#66bb6a', '#1b5e20'],
+                    title='Estadísticos F por Modelo y Respuesta')
     st.plotly_chart(fig, use_container_width=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
 
+# ==================== ARCHIVO DE CAMPO ====================
+elif pagina == "📂 Archivo de Campo":
+
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, #4caf50, #66bb6a); 
+                padding: 20px 30px; border-radius: 12px; margin-bottom: 25px;'>
+        <h2 style='color: white; margin: 0;'>📂 Análisis de Archivo de Campo</h2>
+        <p style='color: white; margin: 5px 0 0 0; opacity: 0.9;'>
+            CSV o Parquet leídos por bloques: la memoria no crece con el tamaño del archivo
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    modo = st.radio("Origen:", ["📤 Subir archivo", "🗂️ Ruta en el servidor"], horizontal=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        col_trat = st.text_input("Columna de tratamiento", "Tratamiento")
+    with col2:
+        col_resp = st.text_input("Columna de respuesta", "Rendimiento_kg_ha")
+    with col3:
+        tamano_bloque = st.number_input("Filas por bloque", min_value=10_000, max_value=5_000_000,
+                                        value=500_000, step=100_000)
+    
+    if modo == "📤 Subir archivo":
+        archivo = st.file_uploader("Archivo de rendimientos", type=["csv", "gz", "parquet", "pq"])
+        fuente, nombre = archivo, archivo.name if archivo is not None else None
+    else:
+        nombre = st.text_input("Ruta del archivo (CSV o Parquet):")
+        fuente = nombre or None
+    
+    if st.button("🧮 Analizar archivo", disabled=fuente is None):
+        # El archivo se lee en el pool; la página sigue respondiendo mientras tanto
+        identidad = getattr(fuente, 'file_id', None) or (nombre, os.path.getmtime(nombre) if os.path.exists(nombre) else None)
+        clave_trabajo = ('archivo', identidad, col_trat, col_resp, int(tamano_bloque))
+        st.session_state['trabajo_archivo'] = (nombre, obtener_cola_trabajos().enviar(
+            clave_trabajo, lambda: anova_por_bloques(fuente, detectar_formato(nombre), col_trat, col_resp,
+                                                     int(tamano_bloque))))
+        st.session_state.pop('anova_archivo', None)
+    
+    if 'trabajo_archivo' in st.session_state:
+        nombre_trabajo, futuro = st.session_state['trabajo_archivo']
+        if futuro.done():
+            del st.session_state['trabajo_archivo']
+            try:
+                st.session_state['anova_archivo'] = (nombre_trabajo,) + futuro.result()
+            except (OSError, ValueError, KeyError, ImportError) as exc:
+                st.error(f"❌ No se pudo analizar el archivo: {exc}")
+        else:
+            @st.fragment(run_every=1.0)
+            def esperar_archivo():
+                if futuro.done():
+                    st.rerun()
+                st.info(f"⏳ Analizando {nombre_trabajo} en segundo plano...")
+            esperar_archivo()
+    
+    if 'anova_archivo' in st.session_state:
+        nombre_res, anova_arch, resumen_arch = st.session_state['anova_archivo']
+        st.markdown(f"#### 📈 Estadísticas — {nombre_res}")
+        st.caption(f"📊 {int(resumen_arch['n'].sum())} observaciones | 🧪 {len(resumen_arch)} tratamientos")
+        st.dataframe(resumen_arch.round(1), use_container_width=True)
+        mostrar_anova(anova_arch)
+        mostrar_tukey(tukey_desde_estadisticos(resumen_arch.index, resumen_arch['n'], resumen_arch['Media'],
+                                               anova_arch['MS_W'], anova_arch['DF_W']))
+
+# ==================== POTENCIA Y TAMAÑO DE MUESTRA ====================
+elif pagina == "⚡ Potencia":
+
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, #4caf50, #66bb6a); 
+                padding: 20px 30px; border-radius: 12px; margin-bottom: 25px;'>
+        <h2 style='color: white; margin: 0;'>⚡ Potencia y Tamaño de Muestra</h2>
+        <p style='color: white; margin: 5px 0 0 0; opacity: 0.9;'>
+            Simulación Monte Carlo: ¿cuántas parcelas por tratamiento se necesitan?
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        # M3–M5 tienen lotes con submuestreo: su DE es la de parcelas dentro de lote y el
+        # simulador (DCA simple) no incluye la variación entre lotes, así que no se ofrecen
+        base = st.selectbox("Modelo base (medias y DE):",
+                            [i for i in CONFIGS_MODELOS if i not in DISENOS_ANIDADOS],
+                            format_func=lambda i: f"M{i}",
+                            help="Solo diseños sin submuestreo (M3–M5 tienen variación entre lotes)")
+        factor = st.slider("Diferencias entre medias (%)", 10, 200, 100, step=10) / 100
+    with col2:
+        rango_n = st.slider("Parcelas por tratamiento (n)", 2, 100, (3, 30))
+        paso_n = st.number_input("Paso de n", min_value=1, max_value=20, value=1)
+    with col3:
+        n_replicas = st.select_slider("Experimentos simulados por n",
+                                      [500, 1000, 2000, 5000, 10000, 50000, 100000], value=2000)
+        alfa = st.select_slider("α", [0.01, 0.05, 0.10], value=0.05)
+    
+    semilla_base, medias_base, desv_base, _ = CONFIGS_MODELOS[base]
+    medias_sim = escalar_diferencias(medias_base, factor)
+    tamanos_n = list(range(rango_n[0], rango_n[1] + 1, int(paso_n)))
+    
+    if st.button("⚡ Simular potencia"):
+        barra = st.progress(0.0, text="Simulando...")
+        
+        def actualizar(fraccion, restante):
+            barra.progress(fraccion, text=f"Simulando... {fraccion:.0%} · quedan ~{restante:.1f} s")
+        
+        inicio = time.perf_counter()
+        st.session_state['potencia'] = simular_potencia(
+            medias_sim, desv_base, tamanos_n, n_replicas, alfa, semilla=semilla_base, progreso=actualizar)
+        barra.progress(1.0, text=f"✅ {len(tamanos_n) * n_replicas:,} experimentos en "
+                                 f"{time.perf_counter() - inicio:.1f} s")
+    
+    if 'potencia' in st.session_state:
+        potencia = st.session_state['potencia']
+        suficientes = potencia[potencia['Potencia'] >= 0.8]
+        if len(suficientes):
+            st.success(f"**n mínimo para 80% de potencia:** {int(suficientes['n'].iloc[0])} parcelas por tratamiento")
+        else:
+            st.warning("⚠️ Ningún n del rango alcanza 80% de potencia")
+        
+        import plotly.express as px
+        fig = px.line(potencia, x='n', y='Potencia', markers=True,
+                      title='Curva de Potencia', color_discrete_sequence=['#4caf50'])
+        fig.add_hline(y=0.8, line_dash='dash', line_color='#e57373')
+        fig.update_layout(height=400, yaxis_range=[0, 1.05],
+                          xaxis_title='Parcelas por tratamiento (n)')
+        st.plotly_chart(fig, use_container_width=True)
+        st.dataframe(potencia, use_container_width=True, hide_index=True)
+
+# ==================== CAPTURA EN CAMPO ====================
+elif pagina == "📝 Captura en Campo":
+
+    st.markdown("""
+    <div style='background: linear-gradient(135deg, #4caf50, #66bb6a); 
+                padding: 20px 30px; border-radius: 12px; margin-bottom: 25px;'>
+        <h2 style='color: white; margin: 0;'>📝 Captura de Rendimientos en Campo</h2>
+        <p style='color: white; margin: 5px 0 0 0; opacity: 0.9;'>
+            Cada parcela actualiza el ANOVA al instante, sin recalcular todo el experimento
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        origen = st.selectbox("Datos iniciales:", ["Vacío"] + [f"M{i}" for i in CONFIGS_MODELOS]
+                              + ["Simulación de 100.000 parcelas"])
+    with col2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        reiniciar = st.button("🔄 Reiniciar captura")
+    
+    if reiniciar or 'captura' not in st.session_state:
+        if origen == "Vacío":
+            st.session_state['captura'] = AnovaIncremental()
+        elif origen.startswith("M"):
+            st.session_state['captura'] = AnovaIncremental.desde_dataframe(
+                agregar_ids(datos_modelo_cache(int(origen[1:]))))
+        else:
+            semilla_base, medias_base, desv_base, _ = CONFIGS_MODELOS[1]
+            st.session_state['captura'] = AnovaIncremental.desde_dataframe(agregar_ids(
+                generar_datos_modelo(semilla_base, medias_base, desv_base, {t: 25_000 for t in medias_base})))
+    captura = st.session_state['captura']
+    
+    def interpretar_id(texto):
+        texto = texto.strip()
+        return int(texto) if texto.isdigit() and int(texto) in captura else texto
+    
+    tratamientos_conocidos = sorted(set(CONFIGS_MODELOS[1][1]) | set(captura.estadisticas().index))
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        with st.form("nueva_parcela", clear_on_submit=True):
+            st.markdown("#### ➕ Nueva parcela")
+            trat_nuevo = st.selectbox("Tratamiento", tratamientos_conocidos)
+            valor_nuevo = st.number_input("Rendimiento (kg/ha)", min_value=0.0, value=30000.0, step=100.0)
+            id_nuevo = st.text_input("ID (opcional)")
+            if st.form_submit_button("➕ Registrar"):
+                try:
+                    registrado = captura.agregar(trat_nuevo, valor_nuevo, id_nuevo.strip() or None)
+                    st.success(f"Parcela {registrado} registrada")
+                except KeyError as exc:
+                    st.error(f"❌ {exc.args[0]}")
+    
+    with col2:
+        with st.form("corregir_parcela"):
+            st.markdown("#### ✏️ Corregir o eliminar")
+            id_editar = st.text_input("ID de la parcela")
+            valor_editar = st.number_input("Nuevo rendimiento (kg/ha)", min_value=0.0, value=30000.0, step=100.0)
+            trat_editar = st.selectbox("Nuevo tratamiento", ["(sin cambio)"] + tratamientos_conocidos)
+            c1, c2 = st.columns(2)
+            actualizar = c1.form_submit_button("✏️ Actualizar")
+            eliminar = c2.form_submit_button("🗑️ Eliminar")
+            if actualizar or eliminar:
+                clave_obs = interpretar_id(id_editar)
+                if clave_obs not in captura:
+                    st.error(f"❌ No existe la parcela {id_editar!r}")
+                elif eliminar:
+                    captura.eliminar(clave_obs)
+                    st.success(f"Parcela {clave_obs} eliminada")
+                else:
+                    captura.actualizar(clave_obs, valor_editar,
+                                       None if trat_editar == "(sin cambio)" else trat_editar)
+                    st.success(f"Parcela {clave_obs} actualizada")
+    
+    st.markdown("---")
+    cols = st.columns(3)
+    cols[0].metric("Parcelas", f"{len(captura):,}")
+    mejor_captura = captura.mejor()
+    if mejor_captura is not None:
+        cols[1].metric("Mejor", mejor_captura[0])
+        cols[2].metric("Rendimiento", f"{mejor_captura[1]:.0f} kg/ha")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.markdown("#### 📈 Estadísticas")
+        st.dataframe(captura.estadisticas().round(1), use_container_width=True)
+    with col2:
+        st.markdown("#### 🕒 Últimas parcelas")
+        st.dataframe(captura.ultimas(10).astype({'ID': str}), use_container_width=True, hide_index=True)
+    
+    if captura.puede_analizar():
+        mostrar_anova(captura.anova())
+    else:
+        st.info("ℹ️ Registre al menos 2 tratamientos y más parcelas que tratamientos para ver el ANOVA")
+
 # ==================== INFORMACIÓN ====================
 elif pagina == "ℹ️ Información":
-    
+
     st.markdown("""
     <div style='background: white; padding: 30px; border-radius: 12px; box-shadow: 0 2px 8px rgba(0,0,0,0.1);'>
         <h2 style='color: #2e7d32;'>ℹ️ Acerca del Sistema</h2>
@@ -471,6 +873,73 @@ elif pagina == "ℹ️ Información":
     </div>
     """, unsafe_allow_html=True)
 
+# Tiempo de la página sin contar los paneles de diagnóstico de abajo
+if PERFILADOR.activo:
+    PERFILADOR.registrar(f"pagina.{pagina.split(' ', 1)[1]}", time.perf_counter() - inicio_pagina)
+
+def metricas_servidor():
+    """Gauges de caché, almacén y cola para las descargas (se consultan al descargar)."""
+    info_cache = obtener_cache_resultados().estadisticas()
+    info_cola = obtener_cola_trabajos().estadisticas()
+    return {
+        'cache_entradas': info_cache['entradas'], 'cache_aciertos': info_cache['aciertos'],
+        'cache_fallos': info_cache['fallos'], 'almacen_bytes': obtener_almacen().estadisticas()['bytes'],
+        'trabajos_en_curso': info_cola['en_curso'], 'trabajos_fusionados': info_cola['fusionados']
+    }
+
+def cambiar_medicion(activo):
+    # Solo cambia con un clic: la medición es del proceso y la comparten todas las sesiones
+    PERFILADOR.activo = activo
+
+# Contadores de la caché para dimensionarla; los paneles solo consultan algo si están abiertos
+with st.sidebar:
+    panel_cache = st.expander("🗄️ Caché de resultados", key="panel_cache", on_change="rerun")
+    if panel_cache.open:
+        with panel_cache:
+            info_cache = obtener_cache_resultados().estadisticas()
+            st.caption(f"Entradas: {info_cache['entradas']}/{info_cache['max_entradas']}")
+            st.caption(f"Aciertos: {info_cache['aciertos']} | Fallos: {info_cache['fallos']} "
+                       f"({info_cache['tasa_aciertos']:.0%})")
+            info_almacen = obtener_almacen().estadisticas()
+            if info_almacen['disponible']:
+                st.caption(f"Almacén en disco: {info_almacen['entradas']} entradas · "
+                           f"{info_almacen['bytes'] / 1024 ** 2:.1f}/{info_almacen['max_bytes'] / 1024 ** 2:.0f} MB · "
+                           f"aciertos {info_almacen['aciertos']} | fallos {info_almacen['fallos']}")
+            else:
+                st.caption("Almacén en disco desactivado (ver el log del servidor)")
+            info_cola = obtener_cola_trabajos().estadisticas()
+            st.caption(f"Trabajos: {info_cola['en_curso']} en curso · {info_cola['enviados']} enviados · "
+                       f"{info_cola['fusionados']} fusionados ({info_cola['trabajadores']} hilos)")
+            if st.button("🧹 Vaciar caché"):
+                obtener_cache_resultados().limpiar()
+            if st.button("🗑️ Vaciar almacén en disco"):
+                obtener_almacen().limpiar()
+    
+    # Tiempos por etapa; la medición es del proceso y afecta a todas las sesiones
+    panel_diagnostico = st.expander("🩺 Diagnóstico", key="panel_diagnostico", on_change="rerun")
+    if panel_diagnostico.open:
+        with panel_diagnostico:
+            if PERFILADOR.activo:
+                st.button("⏹️ Dejar de medir tiempos", on_click=cambiar_medicion, args=(False,))
+            else:
+                st.button("▶️ Medir tiempos", on_click=cambiar_medicion, args=(True,))
+            resumen_perfil = PERFILADOR.resumen()
+            if resumen_perfil:
+                st.dataframe(pd.DataFrame(resumen_perfil).round(1), use_container_width=True, hide_index=True)
+            else:
+                st.caption("Sin mediciones todavía")
+            memoria = memoria_proceso()
+            if memoria['rss_bytes'] is not None:
+                st.caption(f"Memoria del proceso: {memoria['rss_bytes'] / 1024 ** 2:.0f} MB "
+                           f"(máx. {memoria['rss_max_bytes'] / 1024 ** 2:.0f} MB)")
+            col1, col2 = st.columns(2)
+            col1.download_button("JSON", lambda: PERFILADOR.a_json(metricas_servidor()), "dca_papa_metricas.json",
+                                 mime="application/json")
+            col2.download_button("Prometheus", lambda: PERFILADOR.a_prometheus(metricas_servidor()),
+                                 "dca_papa_metricas.prom", mime="text/plain")
+            if st.button("🧽 Reiniciar mediciones"):
+                PERFILADOR.limpiar()
+
 # Footer minimalista
 st.markdown("<br><br>", unsafe_allow_html=True)
 st.markdown("""
@@ -0,0 +1,219 @@
+"""Benchmarks de generación, ANOVA, Comparativa Global, figuras y exportación a Excel.
+
+Cada caso se ejecuta para una grilla de tamaños (n parcelas × k tratamientos) y se mide el
+mejor tiempo de varias repeticiones, tras una llamada de calentamiento sin medir, y el pico
+de memoria (tracemalloc, en una corrida aparte para no distorsionar el tiempo). Los resultados se guardan en JSON y pueden compararse
+contra una línea base guardada:
+
+    python benchmarks/bench_dca.py --perfil rapido --salida base.json
+    python benchmarks/bench_dca.py --perfil rapido --comparar base.json
+
+Con --comparar el código de salida es 1 si algún caso es más lento que la base por encima
+del umbral (--umbral, 10% por defecto).
+
+--memoria compara la representación compacta (tratamiento categórico, IDs derivados y
+rendimiento float64 o float32) con la antigua de strings por fila:
+
+    python benchmarks/bench_dca.py --memoria --n 1000000
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+import pandas as pd
+
+from dca_papa.anova import calcular_anova_simple, tabla_anova
+from dca_papa.datos import generar_datos_modelo
+from dca_papa.exportar import exportar_resultados
+from dca_papa.graficos import figura_cajas, figura_medias, resumen_cajas
+
+PERFILES = {
+    'rapido': {'n': [60, 10_000, 100_000], 'k': [4, 50]},
+    'completo': {'n': [60, 10_000, 100_000, 1_000_000, 10_000_000], 'k': [4, 50, 500]},
+}
+MAX_N_EXCEL = 200_000  # más allá, escribir .xlsx fila a fila domina cualquier otra medición
+
+def config_sintetica(n, k, semilla=100):
+    """Configuración de generar_datos_modelo con k tratamientos que suman ~n parcelas."""
+    tratamientos = [f"T{i + 1}" for i in range(k)]
+    medias = {t: 30000 + 250 * i for i, t in enumerate(tratamientos)}
+    desv = {t: 2500 for t in tratamientos}
+    n_dict = {t: n // k + (1 if i < n % k else 0) for i, t in enumerate(tratamientos)}
+    return semilla, medias, desv, n_dict
+
+def caso_generacion(n, k, directorio):
+    config = config_sintetica(n, k)
+    return lambda: generar_datos_modelo(*config)
+
+def caso_anova(n, k, directorio):
+    df = generar_datos_modelo(*config_sintetica(n, k))
+    return lambda: calcular_anova_simple(df)
+
+def caso_comparativa(n, k, directorio):
+    # Mismo trabajo que la página Comparativa Global: 6 modelos generados y analizados
+    configs = [config_sintetica(n, k, semilla=100 * i) for i in range(1, 7)]
+
+    def correr():
+        for config in configs:
+            df = generar_datos_modelo(*config)
+            calcular_anova_simple(df)
+            df.groupby('Tratamiento', observed=True)['Rendimiento_kg_ha'].mean().idxmax()
+    return correr
+
+def caso_figuras(n, k, directorio):
+    df = generar_datos_modelo(*config_sintetica(n, k))
+
+    def correr():
+        resumen, atipicos = resumen_cajas(df)
+        return len(figura_cajas(resumen, atipicos).to_json()) + len(figura_medias(resumen).to_json())
+    return correr
+
+def caso_excel(n, k, directorio):
+    if n > MAX_N_EXCEL:
+        return None
+    df = generar_datos_modelo(*config_sintetica(n, k))
+    hojas = {'ANOVA': tabla_anova(calcular_anova_simple(df))}
+    return lambda: exportar_resultados(directorio / f'resultados_{n}_{k}.xlsx', df, 'xlsx', hojas)
+
+# Cada caso recibe (n, k, directorio temporal de la corrida) y devuelve la función a medir
+CASOS = {
+    'generacion': caso_generacion,
+    'anova': caso_anova,
+    'comparativa': caso_comparativa,
+    'figuras': caso_figuras,
+    'excel': caso_excel,
+}
+
+def representacion_antigua(df):
+    """Tratamiento como strings de Python y un ID "T1-001" almacenado por fila."""
+    tratamiento = df['Tratamiento'].astype(str).astype(object)
+    indice = df.groupby('Tratamiento', observed=True).cumcount().to_numpy() + 1
+    ids = [f"{t}-{i:03d}" for t, i in zip(tratamiento, indice)]
+    return pd.DataFrame({'ID': ids, 'Tratamiento': tratamiento,
+                         'Rendimiento_kg_ha': df['Rendimiento_kg_ha'].astype(np.float64)})
+
+def comparar_memoria(tamanos_n, tamanos_k):
+    print(f"{'n':>10} {'k':>4} {'antigua MB':>11} {'float64 MB':>11} {'float32 MB':>11} "
+          f"{'razón 64':>9} {'razón 32':>9} {'ANOVA antigua':>14} {'ANOVA f32':>10}")
+    for k in tamanos_k:
+        for n in tamanos_n:
+            if n < 2 * k:
+                continue
+            config = config_sintetica(n, k)
+            compacto = generar_datos_modelo(*config)
+            compacto32 = generar_datos_modelo(*config, dtype=np.float32)
+            antiguo = representacion_antigua(compacto)
+            mb = [d.memory_usage(deep=True).sum() / 1e6 for d in (antiguo, compacto, compacto32)]
+            t_antiguo, _ = medir(lambda: calcular_anova_simple(antiguo), 3, memoria=False)
+            t_32, _ = medir(lambda: calcular_anova_simple(compacto32), 3, memoria=False)
+            print(f"{n:>10,} {k:>4} {mb[0]:>11.1f} {mb[1]:>11.1f} {mb[2]:>11.1f} "
+                  f"{mb[0] / mb[1]:>8.1f}x {mb[0] / mb[2]:>8.1f}x "
+                  f"{t_antiguo * 1000:>11.1f} ms {t_32 * 1000:>7.1f} ms", flush=True)
+
+def medir(funcion, repeticiones, memoria=True):
+    # Una llamada sin medir antes: importaciones diferidas, cachés y primeras asignaciones
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    if not memoria:
+        return min(tiempos), None
+
+    gc.collect()
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos), pico / 1e6
+
+def ejecutar(casos, tamanos_n, tamanos_k, repeticiones):
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix='bench_dca_') as temporal:
+        for caso in casos:
+            for k in tamanos_k:
+                for n in tamanos_n:
+                    if n < 2 * k:
+                        continue
+                    funcion = CASOS[caso](n, k, Path(temporal))
+                    if funcion is None:
+                        continue
+                    reps = repeticiones if n <= 1_000_000 else 1
+                    segundos, pico_mb = medir(funcion, reps)
+                    resultados.append({'caso': caso, 'n': n, 'k': k, 'segundos': segundos,
+                                       'pico_mb': pico_mb, 'repeticiones': reps})
+                    print(f"{caso:<12} n={n:<10,} k={k:<4} {segundos * 1000:>10.1f} ms {pico_mb:>9.1f} MB",
+                          flush=True)
+    return resultados
+
+def metadatos():
+    return {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(), 'plataforma': platform.platform(),
+        'numpy': np.__version__, 'pandas': pd.__version__,
+    }
+
+def comparar(resultados, base, umbral):
+    """Imprime la razón actual/base por caso y devuelve las regresiones por encima del umbral."""
+    previos = {(r['caso'], r['n'], r['k']): r for r in base['resultados']}
+    regresiones = []
+    print(f"\n{'caso':<12} {'n':>10} {'k':>4} {'base ms':>10} {'actual ms':>10} {'razón':>7} {'mem':>7}")
+    for r in resultados:
+        previo = previos.get((r['caso'], r['n'], r['k']))
+        if previo is None:
+            continue
+        razon = r['segundos'] / previo['segundos']
+        razon_mem = r['pico_mb'] / previo['pico_mb'] if previo['pico_mb'] else float('nan')
+        marca = ' ⚠️' if razon > 1 + umbral else ''
+        print(f"{r['caso']:<12} {r['n']:>10,} {r['k']:>4} {previo['segundos'] * 1000:>10.1f} "
+              f"{r['segundos'] * 1000:>10.1f} {razon:>6.2f}x {razon_mem:>6.2f}x{marca}")
+        if marca:
+            regresiones.append(r)
+    return regresiones
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--perfil', choices=PERFILES, default='rapido')
+    parser.add_argument('--n', type=int, nargs='+', help="tamaños n (reemplaza al perfil)")
+    parser.add_argument('--k', type=int, nargs='+', help="números de tratamientos (reemplaza al perfil)")
+    parser.add_argument('--casos', nargs='+', choices=CASOS, default=list(CASOS))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--salida', help="guardar los resultados en este JSON")
+    parser.add_argument('--comparar', help="JSON de línea base con el que comparar")
+    parser.add_argument('--umbral', type=float, default=0.10, help="tolerancia de regresión (0.10 = 10%%)")
+    parser.add_argument('--memoria', action='store_true',
+                        help="solo comparar la memoria de la representación compacta con la antigua")
+    args = parser.parse_args(argv)
+
+    perfil = PERFILES[args.perfil]
+    if args.memoria:
+        comparar_memoria(args.n or perfil['n'], args.k or perfil['k'])
+        return 0
+    resultados = ejecutar(args.casos, args.n or perfil['n'], args.k or perfil['k'], args.repeticiones)
+
+    if args.salida:
+        Path(args.salida).write_text(json.dumps({'meta': metadatos(), 'resultados': resultados}, indent=2))
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text())
+        regresiones = comparar(resultados, base, args.umbral)
+        if regresiones:
+            print(f"\n❌ {len(regresiones)} caso(s) más lentos que la base en más de {args.umbral:.0%}")
+            return 1
+        print("\n✅ Sin regresiones respecto a la base")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
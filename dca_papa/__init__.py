@@ -0,0 +1,43 @@
+"""Núcleo de análisis DCA sin interfaz: generación de datos, ANOVA, Tukey, gráficos y exportación.
+
+Los submódulos se cargan al primer uso de cada nombre, y SciPy, Plotly, xlsxwriter y
+PyArrow solo cuando una función los necesita, para que importar el paquete sea rápido.
+"""
+from importlib import import_module
+
+_EXPORTACIONES = {
+    'datos': ['CONFIGS_MODELOS', 'DISENOS_ANIDADOS', 'RESPUESTAS_SECUNDARIAS', 'generar_datos_modelo',
+              'generar_datos_anidados', 'agregar_respuestas_secundarias', 'obtener_datos_modelo',
+              'agregar_ids', 'codigos_tratamiento', 'clave_config', 'clave_modelo',
+              'generar_datos_bifactorial', 'CONFIGS_BIFACTORIAL', 'obtener_datos_bifactorial'],
+    'anova': ['estadisticos_por_tratamiento', 'anova_desde_estadisticos', 'calcular_anova_simple',
+              'calcular_anova_anidado', 'calcular_anova', 'tabla_anova', 'anova_multirespuesta',
+              'anova_multirespuesta_anidado'],
+    'bifactorial': ['estadisticos_por_celda', 'anova_bifactorial_desde_celdas', 'calcular_anova_bifactorial',
+                    'tabla_anova_bifactorial'],
+    'archivos': ['fusionar_estadisticos', 'leer_por_bloques', 'detectar_formato', 'anova_por_bloques'],
+    'tukey': ['q_critico_tukey', 'letras_compactas', 'tukey_desde_estadisticos', 'calcular_tukey'],
+    'graficos': ['resumen_cajas', 'figura_cajas', 'figura_medias', 'figura_puntos', 'figura_interaccion'],
+    'exportar': ['exportar_resultados', 'exportar_excel'],
+    'remuestreo': ['anova_remuestreo', 'medias_por_lote'],
+    'potencia': ['simular_potencia', 'escalar_diferencias'],
+    'incremental': ['AnovaIncremental'],
+    'cache': ['CacheLRU'],
+    'almacen': ['AlmacenResultados', 'VERSION_ALMACEN'],
+    'trabajos': ['ColaTrabajos'],
+    'perfil': ['Perfilador', 'PERFILADOR', 'memoria_proceso'],
+}
+_MODULO_DE = {nombre: modulo for modulo, nombres in _EXPORTACIONES.items() for nombre in nombres}
+
+__all__ = sorted(_MODULO_DE)
+
+def __getattr__(nombre):
+    modulo = _MODULO_DE.get(nombre)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+    valor = getattr(import_module(f'.{modulo}', __name__), nombre)
+    globals()[nombre] = valor
+    return valor
+
+def __dir__():
+    return __all__
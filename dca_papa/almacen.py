@@ -0,0 +1,207 @@
+"""Almacén persistente de resultados en SQLite, compartido entre procesos del servidor."""
+import hashlib
+import logging
+import os
+import pickle
+import stat
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Subir este número cuando cambie el formato o el cálculo de algún resultado almacenado
+VERSION_ALMACEN = 2
+# SQLite no admite blobs de más de 1e9 bytes (SQLITE_MAX_LENGTH por defecto)
+MAX_BYTES_ENTRADA = 900 * 1024 ** 2
+
+log = logging.getLogger(__name__)
+
+def directorio_por_defecto():
+    """Directorio de caché del usuario (XDG_CACHE_HOME o ~/.cache)/dca_papa."""
+    return Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'dca_papa'
+
+def _verificar_propietario(ruta):
+    """Rechaza rutas de otro usuario o escribibles por otros: el almacén se lee con pickle."""
+    if not hasattr(os, 'getuid'):
+        return
+    info = ruta.stat()
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"'{ruta}' pertenece a otro usuario (uid {info.st_uid})")
+    if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"'{ruta}' es escribible por otros usuarios")
+
+def preparar_directorio(directorio):
+    """Crea el directorio con permisos 0o700 y verifica que sea del usuario del proceso."""
+    directorio = Path(directorio)
+    directorio.mkdir(mode=0o700, parents=True, exist_ok=True)
+    _verificar_propietario(directorio)
+    return directorio
+
+class AlmacenResultados:
+    """Resultados serializados por huella de contenido con desalojo por tamaño total.
+    
+    Varios procesos pueden leer y escribir a la vez: SQLite en modo WAL serializa las
+    escrituras y cada operación abre su propia conexión. Cuando el total supera
+    `max_bytes`, se borran las entradas usadas hace más tiempo.
+    
+    Es solo una caché: si el archivo no se puede abrir, leer o escribir, el error se registra
+    en el log y el resultado se calcula como si no hubiera almacén. Como las entradas se leen
+    con pickle, el directorio y el archivo deben ser del usuario del proceso y no escribibles
+    por otros; si no, el almacén queda desactivado.
+    """
+    
+    def __init__(self, ruta, max_bytes=2 * 1024 ** 3):
+        self.ruta = Path(ruta)
+        self.max_bytes = max_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self._lock = threading.Lock()
+        self.disponible = False
+        try:
+            preparar_directorio(self.ruta.parent)
+            if self.ruta.exists():
+                _verificar_propietario(self.ruta)
+            conexion = self._conectar()
+            try:
+                with conexion:
+                    conexion.execute("PRAGMA journal_mode=WAL")
+                    conexion.execute("""
+                        CREATE TABLE IF NOT EXISTS resultados (
+                            huella TEXT PRIMARY KEY,
+                            tipo TEXT NOT NULL,
+                            valor BLOB NOT NULL,
+                            tamano INTEGER NOT NULL,
+                            creado REAL NOT NULL,
+                            ultimo_acceso REAL NOT NULL
+                        )""")
+                    conexion.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON resultados (ultimo_acceso)")
+            finally:
+                conexion.close()
+            self.disponible = True
+        except (sqlite3.Error, OSError) as exc:
+            log.warning("Almacén de resultados desactivado (%s): %s", self.ruta, exc)
+    
+    def _conectar(self):
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        conexion.execute("PRAGMA busy_timeout=30000")
+        return conexion
+    
+    @staticmethod
+    def huella(clave):
+        return hashlib.sha256(repr((VERSION_ALMACEN, clave)).encode()).hexdigest()
+    
+    def _contar(self, acierto):
+        with self._lock:
+            if acierto:
+                self.aciertos += 1
+            else:
+                self.fallos += 1
+    
+    def leer(self, clave):
+        """Devuelve (encontrado, valor); cualquier error de E/S cuenta como no encontrado."""
+        if not self.disponible:
+            return False, None
+        try:
+            return self._leer(self.huella(clave))
+        except (sqlite3.Error, OSError) as exc:
+            log.warning("No se pudo leer del almacén de resultados: %s", exc)
+            return False, None
+    
+    def _leer(self, huella):
+        conexion = self._conectar()
+        try:
+            with conexion:
+                fila = conexion.execute("SELECT valor FROM resultados WHERE huella = ?", (huella,)).fetchone()
+                if fila is None:
+                    return False, None
+                conexion.execute("UPDATE resultados SET ultimo_acceso = ? WHERE huella = ?", (time.time(), huella))
+            try:
+                return True, pickle.loads(fila[0])
+            except Exception:
+                # Entrada ilegible (p. ej. escrita por otra versión de las librerías): se descarta
+                with conexion:
+                    conexion.execute("DELETE FROM resultados WHERE huella = ?", (huella,))
+                return False, None
+        finally:
+            conexion.close()
+    
+    def guardar(self, clave, valor):
+        """Guarda `valor` si se puede; nunca falla por el almacén."""
+        if not self.disponible:
+            return
+        try:
+            blob = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            log.warning("Resultado no serializable, no se guarda en el almacén: %s", exc)
+            return
+        if len(blob) > min(self.max_bytes, MAX_BYTES_ENTRADA):
+            return
+        ahora = time.time()
+        tipo = clave[0] if isinstance(clave, tuple) and clave and isinstance(clave[0], str) else ''
+        try:
+            conexion = self._conectar()
+            try:
+                with conexion:
+                    conexion.execute("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?, ?, ?)",
+                                     (self.huella(clave), tipo, blob, len(blob), ahora, ahora))
+                    self._desalojar(conexion)
+            finally:
+                conexion.close()
+        except (sqlite3.Error, OSError) as exc:
+            log.warning("No se pudo escribir en el almacén de resultados: %s", exc)
+    
+    def _desalojar(self, conexion):
+        total = conexion.execute("SELECT COALESCE(SUM(tamano), 0) FROM resultados").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        sobrantes = []
+        for huella, tamano in conexion.execute("SELECT huella, tamano FROM resultados ORDER BY ultimo_acceso"):
+            if total <= self.max_bytes:
+                break
+            sobrantes.append((huella,))
+            total -= tamano
+        conexion.executemany("DELETE FROM resultados WHERE huella = ?", sobrantes)
+    
+    def obtener(self, clave, calcular):
+        encontrado, valor = self.leer(clave)
+        self._contar(encontrado)
+        if encontrado:
+            return valor
+        valor = calcular()
+        self.guardar(clave, valor)
+        return valor
+    
+    def limpiar(self):
+        if self.disponible:
+            try:
+                conexion = self._conectar()
+                try:
+                    with conexion:
+                        conexion.execute("DELETE FROM resultados")
+                finally:
+                    conexion.close()
+            except (sqlite3.Error, OSError) as exc:
+                log.warning("No se pudo vaciar el almacén de resultados: %s", exc)
+        with self._lock:
+            self.aciertos = 0
+            self.fallos = 0
+    
+    def estadisticas(self):
+        entradas = total = 0
+        if self.disponible:
+            try:
+                conexion = self._conectar()
+                try:
+                    entradas, total = conexion.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM resultados").fetchone()
+                finally:
+                    conexion.close()
+            except (sqlite3.Error, OSError) as exc:
+                log.warning("No se pudo consultar el almacén de resultados: %s", exc)
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'disponible': self.disponible, 'entradas': entradas, 'bytes': total, 'max_bytes': self.max_bytes,
+                'aciertos': self.aciertos, 'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0.0
+            }
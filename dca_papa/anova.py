@@ -0,0 +1,226 @@
+"""ANOVA de una vía y con submuestreo a partir de estadísticos suficientes."""
+import numpy as np
+import pandas as pd
+
+from .datos import codigos_tratamiento
+from .perfil import instrumentar
+
+@instrumentar('estadisticos.tratamiento')
+def estadisticos_por_tratamiento(df, respuesta='Rendimiento_kg_ha'):
+    """Conteo, media y M2 (suma de cuadrados de desviaciones) por tratamiento en una sola pasada."""
+    codigos, niveles = codigos_tratamiento(df['Tratamiento'])
+    y = df[respuesta].to_numpy()
+    validos = codigos >= 0
+    if not validos.all():
+        codigos, y = codigos[validos], y[validos]
+    k = len(niveles)
+    
+    # Desplazar por un valor de referencia evita la cancelación numérica en sumas de cuadrados
+    ref = float(y[0]) if len(y) else 0.0
+    d = np.subtract(y, ref, dtype=np.float64)
+    n = np.bincount(codigos, minlength=k).astype(np.float64)
+    suma = np.bincount(codigos, weights=d, minlength=k)
+    suma2 = np.bincount(codigos, weights=d * d, minlength=k)
+    
+    medias = ref + suma / n
+    m2 = np.maximum(suma2 - suma ** 2 / n, 0.0)
+    return niveles, n, medias, m2
+
+def anova_desde_estadisticos(n, medias, m2):
+    """Tabla ANOVA de una vía a partir de los estadísticos suficientes de cada grupo."""
+    from scipy import stats
+    
+    n = np.asarray(n, dtype=np.float64)
+    medias = np.asarray(medias, dtype=np.float64)
+    m2 = np.asarray(m2, dtype=np.float64)
+    
+    n_total = n.sum()
+    k = len(n)
+    grand_mean = (n * medias).sum() / n_total
+    
+    ss_between = (n * (medias - grand_mean) ** 2).sum()
+    ss_within = m2.sum()
+    ss_total = ss_between + ss_within
+    
+    df_between = k - 1
+    df_within = int(n_total) - k
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ms_between = ss_between / np.float64(df_between)
+        ms_within = ss_within / np.float64(df_within)
+        f_stat = ms_between / ms_within
+    p_value = stats.f.sf(f_stat, df_between, df_within)
+    
+    return {
+        'F': f_stat, 'P': p_value, 'SS_B': ss_between, 'SS_W': ss_within,
+        'SS_T': ss_total, 'DF_B': df_between, 'DF_W': df_within,
+        'MS_B': ms_between, 'MS_W': ms_within
+    }
+
+@instrumentar('anova.simple')
+def calcular_anova_simple(df):
+    _, n, medias, m2 = estadisticos_por_tratamiento(df)
+    return anova_desde_estadisticos(n, medias, m2)
+
+@instrumentar('anova.anidado')
+def calcular_anova_anidado(df, respuesta='Rendimiento_kg_ha'):
+    """ANOVA con submuestreo (lotes dentro de tratamientos), balanceado o no en cada nivel.
+    
+    Las SC salen de estadísticos por lote agregados a tratamiento, sin recorrer lotes en Python.
+    'SS_W', 'DF_W' y 'MS_W' corresponden al error experimental (lotes), que es el término
+    de error correcto para comparar tratamientos.
+    """
+    from scipy import stats
+    
+    cod_trat, niveles = codigos_tratamiento(df['Tratamiento'])
+    etiqueta_lote = pd.factorize(df['Lote'])[0]
+    y = df[respuesta].to_numpy()
+    validos = (cod_trat >= 0) & (etiqueta_lote >= 0)
+    if not validos.all():
+        cod_trat, etiqueta_lote, y = cod_trat[validos], etiqueta_lote[validos], y[validos]
+    # Los lotes se identifican por (tratamiento, lote) aunque la etiqueta se repita entre tratamientos
+    cod_lote, _ = pd.factorize(pd.MultiIndex.from_arrays([cod_trat, etiqueta_lote]))
+    k = len(niveles)
+    n_lotes = cod_lote.max() + 1
+    
+    ref = float(y[0])
+    d = np.subtract(y, ref, dtype=np.float64)
+    n_l = np.bincount(cod_lote, minlength=n_lotes).astype(np.float64)
+    suma_l = np.bincount(cod_lote, weights=d, minlength=n_lotes)
+    suma2_l = np.bincount(cod_lote, weights=d * d, minlength=n_lotes)
+    media_l = suma_l / n_l
+    
+    trat_de_lote = np.zeros(n_lotes, dtype=np.int64)
+    trat_de_lote[cod_lote] = cod_trat
+    n_t = np.bincount(trat_de_lote, weights=n_l, minlength=k)
+    media_t = np.bincount(trat_de_lote, weights=suma_l, minlength=k) / n_t
+    media_g = d.mean()
+    
+    ss_sub = np.maximum(suma2_l - suma_l ** 2 / n_l, 0.0).sum()
+    ss_lote = (n_l * (media_l - media_t[trat_de_lote]) ** 2).sum()
+    ss_trat = (n_t * (media_t - media_g) ** 2).sum()
+    
+    df_trat = k - 1
+    df_lote = n_lotes - k
+    df_sub = len(y) - n_lotes
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ms_trat = ss_trat / np.float64(df_trat)
+        ms_lote = ss_lote / np.float64(df_lote)
+        ms_sub = ss_sub / np.float64(df_sub)
+        f_trat = ms_trat / ms_lote
+        f_lote = ms_lote / ms_sub
+    
+    return {
+        'F': f_trat, 'P': stats.f.sf(f_trat, df_trat, df_lote),
+        'SS_B': ss_trat, 'SS_W': ss_lote, 'SS_S': ss_sub, 'SS_T': ss_trat + ss_lote + ss_sub,
+        'DF_B': df_trat, 'DF_W': df_lote, 'DF_S': df_sub,
+        'MS_B': ms_trat, 'MS_W': ms_lote, 'MS_S': ms_sub,
+        'F_L': f_lote, 'P_L': stats.f.sf(f_lote, df_lote, df_sub)
+    }
+
+def calcular_anova(df):
+    if 'Lote' in df.columns:
+        return calcular_anova_anidado(df)
+    return calcular_anova_simple(df)
+
+def tabla_anova(anova):
+    if 'SS_S' in anova:
+        return pd.DataFrame({
+            'Fuente': ['Tratamientos', 'Error experimental (lotes)', 'Error de muestreo', 'Total'],
+            'SC': [f"{anova['SS_B']:.1f}", f"{anova['SS_W']:.1f}", f"{anova['SS_S']:.1f}", f"{anova['SS_T']:.1f}"],
+            'GL': [anova['DF_B'], anova['DF_W'], anova['DF_S'], anova['DF_B'] + anova['DF_W'] + anova['DF_S']],
+            'CM': [f"{anova['MS_B']:.1f}", f"{anova['MS_W']:.1f}", f"{anova['MS_S']:.1f}", '-'],
+            'F': [f"{anova['F']:.3f}", f"{anova['F_L']:.3f}", '-', '-'],
+            'P-valor': [f"{anova['P']:.4f}", f"{anova['P_L']:.4f}", '-', '-']
+        })
+    return pd.DataFrame({
+        'Fuente': ['Tratamientos', 'Error', 'Total'],
+        'SC': [f"{anova['SS_B']:.1f}", f"{anova['SS_W']:.1f}", f"{anova['SS_T']:.1f}"],
+        'GL': [anova['DF_B'], anova['DF_W'], anova['DF_B'] + anova['DF_W']],
+        'CM': [f"{anova['MS_B']:.1f}", f"{anova['MS_W']:.1f}", '-'],
+        'F': [f"{anova['F']:.3f}", '-', '-'],
+        'P-valor': [f"{anova['P']:.4f}", '-', '-']
+    })
+
+@instrumentar('anova.multirespuesta')
+def anova_multirespuesta(df, respuestas=None):
+    """ANOVA de una vía para muchas respuestas a la vez tratándolas como una matriz parcela × respuesta.
+    
+    Por defecto se analizan todas las columnas numéricas. Los valores faltantes se excluyen
+    por columna. Devuelve la tabla combinada (una fila por respuesta) y las medias por tratamiento.
+    """
+    from scipy import stats
+    
+    if respuestas is None:
+        respuestas = list(df.select_dtypes('number').columns)
+    codigos, niveles = codigos_tratamiento(df['Tratamiento'])
+    validos = np.flatnonzero(codigos >= 0)
+    orden = validos[np.argsort(codigos[validos], kind='stable')]
+    codigos = codigos[orden]
+    inicio = np.flatnonzero(np.r_[True, codigos[1:] != codigos[:-1]])
+    
+    # Matriz respuesta × parcela con los tratamientos en bloques contiguos
+    Y = df[respuestas].to_numpy(dtype=np.float64).T[:, orden]
+    # Desplazar cada respuesta por un valor de referencia evita la cancelación numérica
+    with np.errstate(invalid='ignore'):
+        ref = np.nan_to_num(np.nanmean(Y[:, :1000], axis=1))
+    Y -= ref[:, None]
+    faltantes = np.isnan(Y)
+    if faltantes.any():
+        Y[faltantes] = 0.0
+        n = np.add.reduceat(~faltantes, inicio, axis=1).astype(np.float64)
+    else:
+        n = np.broadcast_to(np.diff(np.r_[inicio, len(codigos)]).astype(np.float64), (len(respuestas), len(inicio)))
+    suma = np.add.reduceat(Y, inicio, axis=1)
+    Y *= Y
+    suma2 = np.add.reduceat(Y, inicio, axis=1)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        medias_d = suma / n
+        ss_within = np.nansum(suma2 - suma * medias_d, axis=1)
+        n_total = n.sum(axis=1)
+        media_g = suma.sum(axis=1) / n_total
+        ss_between = np.nansum(n * (medias_d - media_g[:, None]) ** 2, axis=1)
+        grupos = (n > 0).sum(axis=1)
+        df_between = grupos - 1
+        df_within = n_total - grupos
+        ms_between = ss_between / df_between
+        ms_within = ss_within / df_within
+        f_stat = ms_between / ms_within
+    p_value = stats.f.sf(f_stat, df_between, df_within)
+    
+    # Tratamientos presentes en el orden de sus códigos (los que no tienen parcelas no aparecen)
+    presentes = np.asarray(list(niveles), dtype=object)[codigos[inicio]]
+    medias = pd.DataFrame((medias_d + ref[:, None]).T, index=pd.Index(presentes, name='Tratamiento'),
+                          columns=respuestas)
+    tabla = pd.DataFrame({
+        'Respuesta': respuestas, 'SC_Trat': ss_between, 'SC_Error': ss_within,
+        'GL_Trat': df_between.astype(np.int64), 'GL_Error': df_within.astype(np.int64),
+        'CM_Trat': ms_between, 'CM_Error': ms_within, 'F': f_stat, 'P': p_value,
+        'Significativo': p_value < 0.05, 'Mejor': medias.idxmax(axis=0).to_numpy()
+    })
+    return tabla, medias
+
+def anova_multirespuesta_anidado(df, respuestas=None):
+    """Como `anova_multirespuesta`, pero con el ANOVA con submuestreo de cada respuesta.
+    
+    Así la fila de cada respuesta coincide con `calcular_anova_anidado` (error de lotes) y no
+    con un ANOVA sobre medias de lote, que difiere cuando los lotes no tienen igual número
+    de parcelas.
+    """
+    if respuestas is None:
+        respuestas = list(df.select_dtypes('number').columns)
+    anovas = [calcular_anova_anidado(df, respuesta) for respuesta in respuestas]
+    medias = df.groupby('Tratamiento', observed=True, sort=True)[respuestas].mean()
+    
+    def columna(clave):
+        return np.array([anova[clave] for anova in anovas], dtype=np.float64)
+    
+    tabla = pd.DataFrame({
+        'Respuesta': respuestas, 'SC_Trat': columna('SS_B'), 'SC_Error': columna('SS_W'),
+        'GL_Trat': columna('DF_B').astype(np.int64), 'GL_Error': columna('DF_W').astype(np.int64),
+        'CM_Trat': columna('MS_B'), 'CM_Error': columna('MS_W'), 'F': columna('F'), 'P': columna('P'),
+        'Significativo': columna('P') < 0.05, 'Mejor': medias.idxmax(axis=0).to_numpy()
+    })
+    return tabla, medias
@@ -0,0 +1,88 @@
+"""ANOVA por bloques para archivos de campo que no caben en memoria."""
+import numpy as np
+import pandas as pd
+
+from .anova import anova_desde_estadisticos, estadisticos_por_tratamiento
+from .perfil import instrumentar
+
+def fusionar_estadisticos(n_a, media_a, m2_a, n_b, media_b, m2_b):
+    """Combina estadísticos (n, media, M2) de dos particiones (Chan et al., extensión de Welford)."""
+    n = n_a + n_b
+    delta = media_b - media_a
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peso_b = np.where(n > 0, n_b / n, 0.0)
+        media = media_a + delta * peso_b
+        m2 = m2_a + m2_b + np.where(n > 0, delta ** 2 * n_a * n_b / n, 0.0)
+    return n, media, m2
+
+def leer_por_bloques(fuente, formato, columnas, tamano_bloque=500_000, columnas_texto=()):
+    """Itera el archivo en bloques de DataFrame con solo las columnas pedidas.
+    
+    Las `columnas_texto` se leen siempre como texto: si no, cada bloque de CSV infiere su
+    propio tipo y un código 1 puede llegar como "1" en un bloque y "1.0" en otro con faltantes.
+    """
+    if formato == 'parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Leer Parquet requiere 'pyarrow' (pip install pyarrow)") from exc
+        archivo = pq.ParquetFile(fuente)
+        for lote in archivo.iter_batches(batch_size=tamano_bloque, columns=columnas):
+            arreglos = [lote.column(c).cast(pa.string()) if c in columnas_texto else lote.column(c)
+                        for c in lote.schema.names]
+            yield pa.RecordBatch.from_arrays(arreglos, names=lote.schema.names).to_pandas()
+    elif formato == 'csv':
+        # Un archivo subido (buffer) no permite a pandas deducir la compresión por la extensión
+        nombre = str(getattr(fuente, 'name', fuente)).lower()
+        yield from pd.read_csv(fuente, usecols=columnas, chunksize=tamano_bloque,
+                               dtype={c: str for c in columnas_texto},
+                               compression='gzip' if nombre.endswith('.gz') else 'infer')
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+
+def detectar_formato(nombre):
+    nombre = str(nombre).lower()
+    if nombre.endswith(('.parquet', '.pq')):
+        return 'parquet'
+    if nombre.endswith(('.csv', '.csv.gz', '.txt')):
+        return 'csv'
+    raise ValueError(f"No se reconoce el formato de '{nombre}' (use CSV o Parquet)")
+
+@instrumentar('archivo.anova_por_bloques')
+def anova_por_bloques(fuente, formato, col_trat='Tratamiento', col_resp='Rendimiento_kg_ha',
+                      tamano_bloque=500_000):
+    """ANOVA de una vía leyendo el archivo por bloques; la memoria depende solo del tamaño de bloque."""
+    niveles = {}
+    n = np.zeros(0)
+    medias = np.zeros(0)
+    m2 = np.zeros(0)
+    
+    for bloque in leer_por_bloques(fuente, formato, [col_trat, col_resp], tamano_bloque, [col_trat]):
+        # Los rendimientos que no son números (p. ej. "x" en una celda) se descartan como faltantes
+        bloque = pd.DataFrame({'Tratamiento': bloque[col_trat],
+                               'Rendimiento_kg_ha': pd.to_numeric(bloque[col_resp], errors='coerce')})
+        bloque = bloque.dropna()
+        if bloque.empty:
+            continue
+        niv_b, n_b, medias_b, m2_b = estadisticos_por_tratamiento(bloque)
+        
+        # Alinear los tratamientos del bloque con los acumulados
+        for t in niv_b:
+            if t not in niveles:
+                niveles[t] = len(niveles)
+        faltan = len(niveles) - len(n)
+        if faltan:
+            n, medias, m2 = (np.concatenate([a, np.zeros(faltan)]) for a in (n, medias, m2))
+        idx = np.array([niveles[t] for t in niv_b])
+        n[idx], medias[idx], m2[idx] = fusionar_estadisticos(
+            n[idx], medias[idx], m2[idx], n_b, medias_b, m2_b)
+    
+    if len(n) < 2:
+        raise ValueError("Se necesitan al menos 2 tratamientos con datos para el ANOVA")
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        de = np.sqrt(m2 / (n - 1))
+    resumen = pd.DataFrame({'n': n.astype(np.int64), 'Media': medias, 'DE': de},
+                           index=pd.Index(list(niveles), name='Tratamiento'))
+    return anova_desde_estadisticos(n, medias, m2), resumen
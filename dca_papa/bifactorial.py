@@ -0,0 +1,141 @@
+"""ANOVA bifactorial (fertilizante × variedad) con interacción a partir de estadísticos por celda.
+
+Todo se calcula sobre la grilla de celdas (n, media y M2 de cada combinación), así que el
+costo después de la pasada inicial depende del número de celdas y no del de parcelas. Con
+datos no balanceados se ofrecen SC tipo I (secuencial, A y luego B), II y III.
+"""
+import numpy as np
+import pandas as pd
+
+from .datos import codigos_tratamiento
+from .perfil import instrumentar
+
+@instrumentar('estadisticos.celda')
+def estadisticos_por_celda(df, factor_a='Tratamiento', factor_b='Variedad', respuesta='Rendimiento_kg_ha'):
+    """Niveles de cada factor y matrices a × b de conteos, medias y M2 en una sola pasada."""
+    cod_a, niveles_a = codigos_tratamiento(df[factor_a])
+    cod_b, niveles_b = codigos_tratamiento(df[factor_b])
+    y = df[respuesta].to_numpy()
+    validos = (cod_a >= 0) & (cod_b >= 0)
+    if not validos.all():
+        cod_a, cod_b, y = cod_a[validos], cod_b[validos], y[validos]
+    a, b = len(niveles_a), len(niveles_b)
+    celda = cod_a.astype(np.int64) * b + cod_b
+    
+    ref = float(y[0]) if len(y) else 0.0
+    d = np.subtract(y, ref, dtype=np.float64)
+    n = np.bincount(celda, minlength=a * b).astype(np.float64)
+    suma = np.bincount(celda, weights=d, minlength=a * b)
+    suma2 = np.bincount(celda, weights=d * d, minlength=a * b)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        medias = np.where(n > 0, ref + suma / n, np.nan)
+        m2 = np.where(n > 0, np.maximum(suma2 - suma ** 2 / n, 0.0), 0.0)
+    return niveles_a, niveles_b, n.reshape(a, b), medias.reshape(a, b), m2.reshape(a, b)
+
+def _ajuste_aditivo(n, c):
+    """Ajuste por mínimos cuadrados ponderados de α_i + β_j a las medias de celda centradas.
+    
+    Las ecuaciones normales son (a + b) × (a + b) y se arman con los totales marginales,
+    sin construir la matriz de diseño por parcela.
+    """
+    a, b = n.shape
+    nc = n * c
+    normal = np.block([[np.diag(n.sum(axis=1)), n], [n.T, np.diag(n.sum(axis=0))]])
+    lado_derecho = np.r_[nc.sum(axis=1), nc.sum(axis=0)]
+    theta, _, rango, _ = np.linalg.lstsq(normal, lado_derecho, rcond=None)
+    return theta[:a, None] + theta[None, a:], int(rango)
+
+def _sc_marginal_tipo3(medias, n, eje):
+    """SC tipo III de un efecto principal: igualdad de las medias marginales no ponderadas.
+    
+    Cada media marginal r_i = promedio_j μ_ij tiene varianza σ²·Σ_j (1/n_ij) / b², y la SC
+    de la hipótesis es la suma ponderada de cuadrados de las r_i alrededor de su media
+    ponderada por 1/varianza.
+    """
+    otros = medias.shape[1 - eje]
+    r = medias.mean(axis=1 - eje)
+    w = otros ** 2 / (1.0 / n).sum(axis=1 - eje)
+    return (w * (r - (w * r).sum() / w.sum()) ** 2).sum()
+
+@instrumentar('anova.bifactorial')
+def anova_bifactorial_desde_celdas(n, medias, m2, tipo=2):
+    """Tabla ANOVA bifactorial con interacción a partir de las matrices de celda.
+    
+    El error es el de celdas (modelo completo). Con diseño balanceado los tres tipos de SC
+    coinciden; el tipo III exige que todas las celdas tengan parcelas.
+    """
+    from scipy import stats
+    
+    if tipo not in (1, 2, 3):
+        raise ValueError(f"Tipo de suma de cuadrados desconocido: {tipo!r} (use 1, 2 o 3)")
+    n = np.asarray(n, dtype=np.float64)
+    medias = np.asarray(medias, dtype=np.float64)
+    m2 = np.asarray(m2, dtype=np.float64)
+    # Los niveles sin ninguna parcela no aportan información
+    filas, columnas = n.sum(axis=1) > 0, n.sum(axis=0) > 0
+    n, medias, m2 = n[filas][:, columnas], medias[filas][:, columnas], m2[filas][:, columnas]
+    a, b = n.shape
+    llenas = n > 0
+    if tipo == 3 and not llenas.all():
+        raise ValueError("La SC tipo III requiere parcelas en todas las combinaciones de niveles")
+    
+    n_total = n.sum()
+    gran_media = (n[llenas] * medias[llenas]).sum() / n_total
+    c = np.where(llenas, medias - gran_media, 0.0)
+    n_a, n_b = n.sum(axis=1), n.sum(axis=0)
+    media_a = (n * c).sum(axis=1) / n_a
+    media_b = (n * c).sum(axis=0) / n_b
+    
+    ajuste, rango = _ajuste_aditivo(n, c)
+    ss_ab = (n * (c - ajuste) ** 2).sum()
+    if tipo == 1:
+        ss_a = (n_a * media_a ** 2).sum()
+        ss_b = (n * (ajuste - media_a[:, None]) ** 2).sum()
+    elif tipo == 2:
+        ss_a = (n * (ajuste - media_b[None, :]) ** 2).sum()
+        ss_b = (n * (ajuste - media_a[:, None]) ** 2).sum()
+    else:
+        ss_a = _sc_marginal_tipo3(medias, n, 0)
+        ss_b = _sc_marginal_tipo3(medias, n, 1)
+    ss_error = m2.sum()
+    ss_total = ss_error + (n * c ** 2).sum()
+    
+    df_a, df_b = rango - b, rango - a
+    df_ab = int(llenas.sum()) - rango
+    df_error = int(n_total) - int(llenas.sum())
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ms_error = ss_error / np.float64(df_error)
+        ms_a, ms_b = ss_a / np.float64(df_a), ss_b / np.float64(df_b)
+        ms_ab = ss_ab / np.float64(df_ab) if df_ab > 0 else np.nan
+        f_a, f_b, f_ab = ms_a / ms_error, ms_b / ms_error, ms_ab / ms_error
+    
+    return {
+        'tipo': tipo,
+        'SS_A': ss_a, 'SS_B': ss_b, 'SS_AB': ss_ab, 'SS_E': ss_error, 'SS_T': ss_total,
+        'DF_A': df_a, 'DF_B': df_b, 'DF_AB': df_ab, 'DF_E': df_error, 'DF_T': int(n_total) - 1,
+        'MS_A': ms_a, 'MS_B': ms_b, 'MS_AB': ms_ab, 'MS_E': ms_error,
+        'F_A': f_a, 'F_B': f_b, 'F_AB': f_ab,
+        'P_A': stats.f.sf(f_a, df_a, df_error), 'P_B': stats.f.sf(f_b, df_b, df_error),
+        'P_AB': stats.f.sf(f_ab, df_ab, df_error) if df_ab > 0 else np.nan
+    }
+
+def calcular_anova_bifactorial(df, factor_a='Tratamiento', factor_b='Variedad',
+                               respuesta='Rendimiento_kg_ha', tipo=2):
+    _, _, n, medias, m2 = estadisticos_por_celda(df, factor_a, factor_b, respuesta)
+    return anova_bifactorial_desde_celdas(n, medias, m2, tipo)
+
+def tabla_anova_bifactorial(anova, nombre_a='Fertilizante', nombre_b='Variedad'):
+    def fmt(valor, decimales):
+        return '-' if valor is None or np.isnan(valor) else f"{valor:.{decimales}f}"
+    
+    claves = ['A', 'B', 'AB']
+    return pd.DataFrame({
+        'Fuente': [nombre_a, nombre_b, f'{nombre_a} × {nombre_b}', 'Error', 'Total'],
+        'SC': [fmt(anova[f'SS_{c}'], 1) for c in claves + ['E', 'T']],
+        'GL': [anova[f'DF_{c}'] for c in claves + ['E', 'T']],
+        'CM': [fmt(anova[f'MS_{c}'], 1) for c in claves + ['E']] + ['-'],
+        'F': [fmt(anova[f'F_{c}'], 3) for c in claves] + ['-', '-'],
+        'P-valor': [fmt(anova[f'P_{c}'], 4) for c in claves] + ['-', '-']
+    })
@@ -0,0 +1,50 @@
+"""Caché LRU acotada y segura entre hilos."""
+import threading
+from collections import OrderedDict
+
+class CacheLRU:
+    """Diccionario acotado con desalojo LRU y contadores de aciertos/fallos (seguro entre hilos).
+    
+    Con `respaldo` (p. ej. un AlmacenResultados), los fallos se consultan primero ahí antes
+    de calcular, y lo calculado se guarda también en el respaldo.
+    """
+    
+    def __init__(self, max_entradas=64, respaldo=None):
+        self.max_entradas = max_entradas
+        self.respaldo = respaldo
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, clave, calcular):
+        with self._lock:
+            if clave in self._datos:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return self._datos[clave]
+        
+        # El cálculo se hace fuera del lock para no bloquear a otras sesiones
+        valor = self.respaldo.obtener(clave, calcular) if self.respaldo is not None else calcular()
+        with self._lock:
+            self.fallos += 1
+            self._datos[clave] = valor
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+        return valor
+    
+    def limpiar(self):
+        with self._lock:
+            self._datos.clear()
+            self.aciertos = 0
+            self.fallos = 0
+    
+    def estadisticas(self):
+        with self._lock:
+            total = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._datos), 'max_entradas': self.max_entradas,
+                'aciertos': self.aciertos, 'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / total if total else 0.0
+            }
@@ -0,0 +1,165 @@
+"""Modo por lotes: analiza modelos o archivos de campo sin servidor de Streamlit.
+
+    python -m dca_papa modelos 1 2 3 --salida resultados --formato xlsx
+    python -m dca_papa archivo cosecha_2025.parquet --salida resultados --json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+FORMATOS = ('xlsx', 'parquet', 'csv.gz')
+
+class Cronometro:
+    """Acumula tiempos por etapa y los escribe en stderr con --tiempos."""
+
+    def __init__(self, activo):
+        self.activo = activo
+        self.etapas = []
+
+    def medir(self, etapa, inicio):
+        self.etapas.append((etapa, (time.perf_counter() - inicio) * 1000))
+
+    def informar(self):
+        if self.activo:
+            for etapa, ms in self.etapas:
+                print(f"⏱ {etapa}: {ms:.1f} ms", file=sys.stderr)
+
+def _resumen_modelo(numero, df, anova):
+    medias = df.groupby('Tratamiento', observed=True)['Rendimiento_kg_ha'].mean()
+    return {
+        'Modelo': f'M{numero}', 'n': len(df), 'F': float(anova['F']), 'P': float(anova['P']),
+        'Significativo': bool(anova['P'] < 0.05), 'Mejor': str(medias.idxmax())
+    }
+
+def _imprimir(filas, como_json):
+    if como_json:
+        print(json.dumps(filas, ensure_ascii=False, indent=2))
+    else:
+        import pandas as pd
+        print(pd.DataFrame(filas).to_string(index=False))
+
+def comando_modelos(args, crono):
+    inicio = time.perf_counter()
+    from .anova import calcular_anova, tabla_anova
+    from .datos import CONFIGS_MODELOS, obtener_datos_modelo
+    from .tukey import calcular_tukey
+    crono.medir('importación', inicio)
+
+    numeros = args.numeros or sorted(CONFIGS_MODELOS)
+    desconocidos = [n for n in numeros if n not in CONFIGS_MODELOS]
+    if desconocidos:
+        raise SystemExit(f"Modelos desconocidos: {desconocidos} (disponibles: {sorted(CONFIGS_MODELOS)})")
+
+    filas = []
+    for numero in numeros:
+        inicio = time.perf_counter()
+        df = obtener_datos_modelo(numero)
+        crono.medir(f'M{numero} generación', inicio)
+
+        inicio = time.perf_counter()
+        anova = calcular_anova(df)
+        crono.medir(f'M{numero} ANOVA', inicio)
+        filas.append(_resumen_modelo(numero, df, anova))
+
+        if args.salida:
+            from .exportar import exportar_resultados
+            inicio = time.perf_counter()
+            hojas = {'ANOVA': tabla_anova(anova), 'Tukey': calcular_tukey(df, anova)['grupos']}
+            exportar_resultados(Path(args.salida) / f"modelo_{numero}_resultados.{args.formato}",
+                                df, args.formato, hojas)
+            crono.medir(f'M{numero} exportación', inicio)
+
+    _imprimir(filas, args.json)
+    return 0
+
+def comando_archivo(args, crono):
+    inicio = time.perf_counter()
+    from .anova import tabla_anova
+    from .archivos import anova_por_bloques, detectar_formato
+    crono.medir('importación', inicio)
+
+    filas = []
+    codigo = 0
+    for ruta in args.rutas:
+        inicio = time.perf_counter()
+        try:
+            anova, resumen = anova_por_bloques(ruta, detectar_formato(ruta), args.col_trat,
+                                               args.col_resp, args.bloque)
+        except (OSError, ValueError, KeyError, ImportError) as exc:
+            print(f"❌ {ruta}: {exc}", file=sys.stderr)
+            codigo = 1
+            continue
+        crono.medir(f'{ruta} ANOVA', inicio)
+
+        filas.append({
+            'Archivo': ruta, 'n': int(resumen['n'].sum()), 'Tratamientos': len(resumen),
+            'F': float(anova['F']), 'P': float(anova['P']), 'Significativo': bool(anova['P'] < 0.05),
+            'Mejor': str(resumen['Media'].idxmax())
+        })
+        if args.salida:
+            destino = Path(args.salida)
+            destino.mkdir(parents=True, exist_ok=True)
+            base = Path(ruta).name.split('.')[0]
+            tabla_anova(anova).to_csv(destino / f"{base}_anova.csv", index=False)
+            resumen.to_csv(destino / f"{base}_resumen.csv")
+
+    # Si ningún archivo se pudo analizar solo quedan los errores en stderr
+    if filas:
+        _imprimir(filas, args.json)
+    return codigo
+
+def _opciones_comunes(parser, por_defecto=True):
+    """--tiempos, --json y --metricas, válidas antes o después del subcomando.
+
+    En los subcomandos no tienen valor por defecto (SUPPRESS) para no pisar las que se
+    dieron antes del subcomando.
+    """
+    def defecto(valor):
+        return valor if por_defecto else argparse.SUPPRESS
+
+    parser.add_argument('--tiempos', action='store_true', default=defecto(False),
+                        help="mostrar el tiempo de cada etapa en stderr")
+    parser.add_argument('--json', action='store_true', default=defecto(False), help="imprimir el resumen en JSON")
+    parser.add_argument('--metricas', choices=('json', 'prometheus'), default=defecto(None),
+                        help="medir cada etapa del paquete y escribir las métricas en stderr")
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog='python -m dca_papa',
+                                     description="Análisis DCA por lotes (ANOVA y exportación)")
+    _opciones_comunes(parser)
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_mod = sub.add_parser('modelos', help="analizar los modelos simulados")
+    _opciones_comunes(p_mod, por_defecto=False)
+    p_mod.add_argument('numeros', nargs='*', type=int, help="números de modelo (por defecto todos)")
+    p_mod.add_argument('--salida', help="directorio donde exportar los resultados de cada modelo")
+    p_mod.add_argument('--formato', choices=FORMATOS, default='xlsx')
+    p_mod.set_defaults(funcion=comando_modelos)
+
+    p_arch = sub.add_parser('archivo', help="analizar archivos CSV/Parquet por bloques")
+    _opciones_comunes(p_arch, por_defecto=False)
+    p_arch.add_argument('rutas', nargs='+')
+    p_arch.add_argument('--col-trat', default='Tratamiento')
+    p_arch.add_argument('--col-resp', default='Rendimiento_kg_ha')
+    p_arch.add_argument('--bloque', type=int, default=500_000, help="filas por bloque")
+    p_arch.add_argument('--salida', help="directorio para las tablas ANOVA y de resumen (CSV)")
+    p_arch.set_defaults(funcion=comando_archivo)
+    return parser
+
+def main(argv=None):
+    inicio = time.perf_counter()
+    args = crear_parser().parse_args(argv)
+    crono = Cronometro(args.tiempos)
+    from .perfil import PERFILADOR
+    if args.metricas:
+        PERFILADOR.activo = True
+    try:
+        return args.funcion(args, crono)
+    finally:
+        crono.medir('total', inicio)
+        crono.informar()
+        if args.metricas:
+            print(PERFILADOR.a_json() if args.metricas == 'json' else PERFILADOR.a_prometheus(),
+                  file=sys.stderr, end='' if args.metricas == 'prometheus' else '\n')
@@ -0,0 +1,206 @@
+"""Generación de los datos simulados de cada modelo DCA."""
+import numpy as np
+import pandas as pd
+
+from .perfil import instrumentar
+
+@instrumentar('generacion.modelo')
+def generar_datos_modelo(semilla, medias, desv, n_dict=None, dtype=np.float64):
+    """Genera el DataFrame de un modelo con un generador propio por llamada (seguro entre sesiones).
+    
+    Con `dtype=np.float32` el rendimiento ocupa la mitad; los valores simulados son los mismos
+    redondeados a la precisión de float32.
+    """
+    rng = np.random.default_rng(semilla)
+    tratamientos = list(medias.keys())
+    
+    if n_dict is None:
+        n_dict = {t: 15 for t in tratamientos}
+    
+    tamanos = np.array([n_dict[t] for t in tratamientos], dtype=np.int64)
+    codigos = np.repeat(np.arange(len(tratamientos), dtype=np.int32), tamanos)
+    mu = np.array([medias[t] for t in tratamientos], dtype=np.float64)
+    sigma = np.array([desv[t] for t in tratamientos], dtype=np.float64)
+    
+    # Una sola extracción vectorizada: cada tratamiento ocupa un bloque contiguo
+    rendimiento = rng.standard_normal(codigos.size)
+    rendimiento *= sigma[codigos]
+    rendimiento += mu[codigos]
+    
+    return pd.DataFrame({
+        "Tratamiento": pd.Categorical.from_codes(codigos, categories=tratamientos),
+        "Rendimiento_kg_ha": np.round(rendimiento, 1).astype(dtype, copy=False)
+    })
+
+def codigos_tratamiento(tratamiento):
+    """(códigos, niveles) de una columna de tratamientos sin copiarla si es categórica.
+    
+    Los códigos de una categórica se devuelven como vista de solo lectura (int8 para pocos
+    niveles), que es lo que leen el ANOVA y los gráficos. Si hay categorías sin parcelas o
+    faltantes se recurre a pd.factorize, que solo conserva los niveles observados.
+    """
+    if isinstance(tratamiento.dtype, pd.CategoricalDtype):
+        # .array.codes es la vista de pandas; .cat.codes.to_numpy() copia desde pandas 3
+        categorica = tratamiento.array
+        codigos, niveles = categorica.codes, categorica.categories
+        if len(codigos) and codigos.min() >= 0:
+            # Marcar presencia sin contar: evita el bincount y su conversión de int8 a intp
+            presentes = np.zeros(len(niveles), dtype=bool)
+            presentes[codigos] = True
+            if presentes.all():
+                return codigos, niveles
+    return pd.factorize(tratamiento)
+
+def agregar_ids(df):
+    """Construye la columna ID ("T1-001") solo cuando se va a mostrar o exportar."""
+    if "ID" in df.columns:
+        return df
+    indice = df.groupby('Tratamiento', observed=True, sort=False).cumcount() + 1
+    ids = df['Tratamiento'].astype(str) + "-" + indice.astype(str).str.zfill(3)
+    return df.assign(ID=ids.values)[["ID"] + list(df.columns)]
+
+@instrumentar('generacion.anidado')
+def generar_datos_anidados(semilla, medias, desv, lotes, submuestras, desv_lote, dtype=np.float64):
+    """Datos tratamiento → lote → submuestra.
+    
+    `lotes` da el número de lotes por tratamiento; `submuestras` es un entero (balanceado)
+    o un dict con el número de parcelas de cada lote. `desv` es la DE entre parcelas del
+    mismo lote y `desv_lote` la DE del efecto de lote.
+    """
+    rng = np.random.default_rng(semilla)
+    tratamientos = list(medias.keys())
+    
+    lotes_por_trat = np.array([lotes[t] for t in tratamientos], dtype=np.int64)
+    trat_lote = np.repeat(np.arange(len(tratamientos), dtype=np.int32), lotes_por_trat)
+    if isinstance(submuestras, dict):
+        parcelas_lote = np.concatenate([np.asarray(submuestras[t], dtype=np.int64) for t in tratamientos])
+    else:
+        parcelas_lote = np.full(trat_lote.size, submuestras, dtype=np.int64)
+    
+    codigo_lote = np.repeat(np.arange(trat_lote.size, dtype=np.int32), parcelas_lote)
+    codigos = trat_lote[codigo_lote]
+    mu = np.array([medias[t] for t in tratamientos], dtype=np.float64)
+    sigma = np.array([desv[t] for t in tratamientos], dtype=np.float64)
+    
+    efecto_lote = rng.standard_normal(trat_lote.size) * desv_lote
+    rendimiento = rng.standard_normal(codigos.size)
+    rendimiento *= sigma[codigos]
+    rendimiento += mu[codigos] + efecto_lote[codigo_lote]
+    
+    # Etiqueta del lote numerada dentro de su tratamiento ("T1-L01")
+    inicio_trat = np.r_[0, np.cumsum(lotes_por_trat)[:-1]]
+    num_lote = np.arange(trat_lote.size) - inicio_trat[trat_lote] + 1
+    etiquetas = [f"{tratamientos[t]}-L{j:02d}" for t, j in zip(trat_lote, num_lote)]
+    
+    return pd.DataFrame({
+        "Tratamiento": pd.Categorical.from_codes(codigos, categories=tratamientos),
+        "Lote": pd.Categorical.from_codes(codigo_lote, categories=etiquetas),
+        "Rendimiento_kg_ha": np.round(rendimiento, 1).astype(dtype, copy=False)
+    })
+
+# Configuración de cada modelo: (semilla, medias, desviaciones, n por tratamiento)
+CONFIGS_MODELOS = {
+    1: (100, {"T1": 32000, "T2": 28000, "T3": 35000, "T4": 30000}, 
+        {"T1": 2500, "T2": 2800, "T3": 2200, "T4": 2600}, None),
+    2: (200, {"T1": 31500, "T2": 29000, "T3": 36000, "T4": 31000},
+        {"T1": 3000, "T2": 2900, "T3": 2400, "T4": 2700},
+        {"T1": 14, "T2": 18, "T3": 16, "T4": 20}),
+    3: (300, {"T1": 32500, "T2": 28500, "T3": 35500, "T4": 30500},
+        {"T1": 2000, "T2": 2200, "T3": 1800, "T4": 2100}, None),
+    4: (400, {"T1": 31800, "T2": 29500, "T3": 36500, "T4": 31500},
+        {"T1": 2100, "T2": 2300, "T3": 1900, "T4": 2200}, None),
+    5: (500, {"T1": 32200, "T2": 28800, "T3": 35800, "T4": 30800},
+        {"T1": 2050, "T2": 2250, "T3": 1850, "T4": 2150}, None),
+    6: (600, {"T1": 31000, "T2": 30000, "T3": 37000, "T4": 32000},
+        {"T1": 2300, "T2": 2500, "T3": 2000, "T4": 2400}, None)
+}
+
+# Modelos con submuestreo: lotes por tratamiento, parcelas por lote y DE entre lotes
+DISENOS_ANIDADOS = {
+    3: {"lotes": {"T1": 5, "T2": 5, "T3": 5, "T4": 5}, "submuestras": 4, "desv_lote": 1500},
+    4: {"lotes": {"T1": 5, "T2": 5, "T3": 5, "T4": 5},
+        "submuestras": {"T1": (3, 4, 5, 4, 4), "T2": (4, 3, 4, 5, 2),
+                        "T3": (5, 4, 3, 4, 4), "T4": (2, 4, 5, 3, 4)}, "desv_lote": 1500},
+    5: {"lotes": {"T1": 4, "T2": 6, "T3": 5, "T4": 5}, "submuestras": 4, "desv_lote": 1500}
+}
+
+# Respuestas adicionales por parcela: (valor base, pendiente respecto al rendimiento, DE, decimales)
+RESPUESTAS_SECUNDARIAS = {
+    "Tuberculos_por_planta": (9.0, 0.00025, 1.2, 1),
+    "Materia_seca_pct": (21.0, 0.0001, 1.0, 2),
+    "Almidon_pct": (14.5, 0.00008, 0.9, 2),
+    "Calibre_comercial_pct": (70.0, 0.0012, 6.0, 1),
+}
+
+def agregar_respuestas_secundarias(df, semilla, respuestas=RESPUESTAS_SECUNDARIAS):
+    """Añade respuestas correlacionadas con el rendimiento.
+    
+    Usan un generador aparte para no alterar los rendimientos ya simulados con `semilla`.
+    """
+    rng = np.random.default_rng([semilla, 1])
+    desvio = df['Rendimiento_kg_ha'].to_numpy() - df['Rendimiento_kg_ha'].mean()
+    columnas = {nombre: np.round(base + pendiente * desvio + de * rng.standard_normal(len(df)), decimales)
+                for nombre, (base, pendiente, de, decimales) in respuestas.items()}
+    return df.assign(**columnas)
+
+@instrumentar('generacion.bifactorial')
+def generar_datos_bifactorial(semilla, medias, efectos_variedad, desv, n_celda, desv_interaccion=0.0,
+                              dtype=np.float64):
+    """Ensayo factorial fertilizante × variedad.
+    
+    El rendimiento de la celda (t, v) es medias[t] + efectos_variedad[v] más un efecto de
+    interacción normal con DE `desv_interaccion`. `n_celda` es un entero (balanceado) o una
+    matriz fertilizantes × variedades con las parcelas de cada celda (0 = celda vacía).
+    """
+    rng = np.random.default_rng(semilla)
+    tratamientos, variedades = list(medias.keys()), list(efectos_variedad.keys())
+    a, b = len(tratamientos), len(variedades)
+    
+    tamanos = np.broadcast_to(np.asarray(n_celda, dtype=np.int64), (a, b)).ravel()
+    celda = np.repeat(np.arange(a * b, dtype=np.int64), tamanos)
+    mu = (np.array([medias[t] for t in tratamientos], dtype=np.float64)[:, None]
+          + np.array([efectos_variedad[v] for v in variedades], dtype=np.float64)[None, :])
+    mu = (mu + rng.standard_normal((a, b)) * desv_interaccion).ravel()
+    
+    rendimiento = rng.standard_normal(celda.size)
+    rendimiento *= desv
+    rendimiento += mu[celda]
+    
+    return pd.DataFrame({
+        "Tratamiento": pd.Categorical.from_codes((celda // b).astype(np.int32), categories=tratamientos),
+        "Variedad": pd.Categorical.from_codes((celda % b).astype(np.int32), categories=variedades),
+        "Rendimiento_kg_ha": np.round(rendimiento, 1).astype(dtype, copy=False)
+    })
+
+# Ensayos factoriales: fertilizantes de los modelos × variedades comerciales de papa
+EFECTOS_VARIEDADES = {"Única": 1500, "Canchán": -500, "Yungay": 0, "Amarilis": -1000}
+CONFIGS_BIFACTORIAL = {
+    "Balanceado (4 × 4 × 5)": (700, CONFIGS_MODELOS[1][1], EFECTOS_VARIEDADES, 2400, 5, 1200),
+    "No balanceado (parcelas perdidas)": (
+        800, CONFIGS_MODELOS[2][1], EFECTOS_VARIEDADES, 2600,
+        ((5, 4, 6, 3), (2, 5, 4, 5), (6, 3, 5, 4), (4, 6, 2, 5)), 1200),
+}
+
+def obtener_datos_bifactorial(nombre):
+    semilla, medias, efectos, desv, n_celda, desv_interaccion = CONFIGS_BIFACTORIAL[nombre]
+    return generar_datos_bifactorial(semilla, medias, efectos, desv, n_celda, desv_interaccion)
+
+def obtener_datos_modelo(numero):
+    semilla, medias, desv, n_dict = CONFIGS_MODELOS[numero]
+    if numero in DISENOS_ANIDADOS:
+        df = generar_datos_anidados(semilla, medias, desv, **DISENOS_ANIDADOS[numero])
+    else:
+        df = generar_datos_modelo(semilla, medias, desv, n_dict)
+    return agregar_respuestas_secundarias(df, semilla)
+
+def clave_config(semilla, medias, desv, n_dict=None):
+    return (semilla, tuple(medias.items()), tuple(desv.items()),
+            tuple(n_dict.items()) if n_dict is not None else None)
+
+def clave_modelo(numero):
+    clave = clave_config(*CONFIGS_MODELOS[numero])
+    diseno = DISENOS_ANIDADOS.get(numero)
+    if diseno is not None:
+        clave += tuple((campo, tuple(valor.items()) if isinstance(valor, dict) else valor)
+                       for campo, valor in sorted(diseno.items()))
+    return clave
@@ -0,0 +1,62 @@
+"""Exportación de resultados a Excel (memoria constante), Parquet y CSV.gz."""
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .datos import agregar_ids
+from .perfil import instrumentar
+
+MAX_FILAS_EXCEL = 1_048_575  # límite de Excel menos la fila de encabezado
+
+def _columna_excel(columna):
+    if isinstance(columna.dtype, pd.CategoricalDtype):
+        return columna.astype(object).to_numpy()
+    if columna.dtype == np.float32:
+        # Pasar por el texto más corto evita escribir 32000.099609375 en lugar de 32000.1
+        return columna.to_numpy().astype(str).astype(np.float64)
+    return columna.to_numpy()
+
+def _escribir_hoja(workbook, nombre, tabla, bloque=50_000):
+    """Escribe fila a fila (orden que exige el modo de memoria constante de xlsxwriter)."""
+    hoja = workbook.add_worksheet(nombre)
+    hoja.write_row(0, 0, [str(c) for c in tabla.columns])
+    for inicio in range(0, len(tabla), bloque):
+        parte = tabla.iloc[inicio:inicio + bloque]
+        columnas = [_columna_excel(parte[c]) for c in parte.columns]
+        for i, fila in enumerate(zip(*columnas), start=inicio + 1):
+            hoja.write_row(i, 0, fila)
+
+def exportar_excel(ruta, df, hojas_extra):
+    import xlsxwriter
+    
+    datos = agregar_ids(df)
+    with xlsxwriter.Workbook(str(ruta), {'constant_memory': True, 'nan_inf_to_errors': True}) as workbook:
+        # Los datos que no caben en una hoja siguen en Datos_2, Datos_3, ...
+        for parte, inicio in enumerate(range(0, max(len(datos), 1), MAX_FILAS_EXCEL), start=1):
+            nombre = 'Datos' if parte == 1 else f'Datos_{parte}'
+            _escribir_hoja(workbook, nombre, datos.iloc[inicio:inicio + MAX_FILAS_EXCEL])
+        for nombre, tabla in hojas_extra.items():
+            _escribir_hoja(workbook, nombre, tabla)
+
+@instrumentar('exportacion')
+def exportar_resultados(ruta, df, formato, hojas_extra=None):
+    """Escribe `df` (y en Excel las tablas de resultados) en `ruta` de forma atómica."""
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_name(f".{ruta.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        if formato == 'xlsx':
+            exportar_excel(temporal, df, hojas_extra or {})
+        elif formato == 'parquet':
+            agregar_ids(df).to_parquet(temporal, index=False)
+        elif formato == 'csv.gz':
+            agregar_ids(df).to_csv(temporal, index=False, compression='gzip')
+        else:
+            raise ValueError(f"Formato de exportación no soportado: {formato}")
+        os.replace(temporal, ruta)
+    finally:
+        temporal.unlink(missing_ok=True)
+    return ruta
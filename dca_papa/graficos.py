@@ -0,0 +1,139 @@
+"""Gráficos escalables: resúmenes calculados en el servidor y trazas WebGL con tope de puntos.
+
+Plotly se importa dentro de cada función para no cargarlo en el modo por lotes.
+"""
+import numpy as np
+import pandas as pd
+
+from .datos import codigos_tratamiento
+from .perfil import instrumentar
+
+COLORES_TRATAMIENTOS = ['#66bb6a', '#4caf50', '#388e3c', '#2e7d32']
+MAX_ATIPICOS_GRAFICO = 2000
+MAX_PUNTOS_GRAFICO = 20000
+UMBRAL_WEBGL = 5000
+
+@instrumentar('figuras.resumen_cajas')
+def resumen_cajas(df, respuesta='Rendimiento_kg_ha', max_atipicos=MAX_ATIPICOS_GRAFICO, semilla=0):
+    """Cuartiles, bigotes (1.5·RIC) y una muestra de atípicos por tratamiento con un solo ordenamiento."""
+    codigos, niveles = codigos_tratamiento(df['Tratamiento'])
+    y = df[respuesta].to_numpy()
+    validos = codigos >= 0
+    if not validos.all():
+        codigos, y = codigos[validos], y[validos]
+    orden = np.lexsort((y, codigos))
+    codigos, y = codigos[orden], y[orden]
+    k = len(niveles)
+    n = np.bincount(codigos, minlength=k)
+    inicio = np.r_[0, np.cumsum(n)[:-1]]
+    
+    def cuantil(p):
+        # Interpolación lineal, igual que np.quantile, sobre cada bloque ordenado
+        pos = inicio + p * (n - 1)
+        bajo = np.floor(pos).astype(np.int64)
+        alto = np.minimum(bajo + 1, inicio + n - 1)
+        return y[bajo] + (pos - bajo) * (y[alto] - y[bajo])
+    
+    q1, mediana, q3 = cuantil(0.25), cuantil(0.5), cuantil(0.75)
+    ric = q3 - q1
+    dentro = (y >= (q1 - 1.5 * ric)[codigos]) & (y <= (q3 + 1.5 * ric)[codigos])
+    bigote_inf = np.minimum.reduceat(np.where(dentro, y, np.inf), inicio)
+    bigote_sup = np.maximum.reduceat(np.where(dentro, y, -np.inf), inicio)
+    
+    resumen = pd.DataFrame({
+        'Tratamiento': list(niveles), 'n': n, 'Media': np.bincount(codigos, weights=y, minlength=k) / n,
+        'Q1': q1, 'Mediana': mediana, 'Q3': q3, 'Bigote inf.': bigote_inf, 'Bigote sup.': bigote_sup
+    })
+    
+    fuera = np.flatnonzero(~dentro)
+    if len(fuera) > max_atipicos:
+        fuera = np.sort(np.random.default_rng(semilla).choice(fuera, max_atipicos, replace=False))
+    atipicos = pd.DataFrame({'Tratamiento': np.asarray(list(niveles), dtype=object)[codigos[fuera]],
+                             respuesta: y[fuera]})
+    return resumen, atipicos
+
+@instrumentar('figuras.cajas')
+def figura_cajas(resumen, atipicos, respuesta='Rendimiento_kg_ha'):
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    por_traza = len(resumen) <= 12
+    grupos = [resumen.iloc[[i]] for i in range(len(resumen))] if por_traza else [resumen]
+    for i, grupo in enumerate(grupos):
+        color = COLORES_TRATAMIENTOS[i % len(COLORES_TRATAMIENTOS)]
+        fig.add_trace(go.Box(
+            y=grupo['Tratamiento'], q1=grupo['Q1'], median=grupo['Mediana'], q3=grupo['Q3'],
+            lowerfence=grupo['Bigote inf.'], upperfence=grupo['Bigote sup.'], mean=grupo['Media'],
+            orientation='h', marker_color=color, name=str(grupo['Tratamiento'].iloc[0]), boxpoints=False
+        ))
+    if len(atipicos):
+        fig.add_trace(go.Scattergl(x=atipicos[respuesta], y=atipicos['Tratamiento'], mode='markers',
+                                   marker=dict(color='#2e7d32', size=5, opacity=0.7), name='Atípicos'))
+    fig.update_layout(title='Distribución por Tratamiento', showlegend=False, height=max(400, 22 * len(resumen)),
+                      xaxis_title=respuesta)
+    return fig
+
+@instrumentar('figuras.medias')
+def figura_medias(resumen):
+    import plotly.graph_objects as go
+    
+    fig = go.Figure(data=[
+        go.Bar(x=resumen['Tratamiento'], y=resumen['Media'],
+               marker_color=list(np.resize(COLORES_TRATAMIENTOS, len(resumen))))
+    ])
+    fig.update_layout(title='Rendimiento Promedio', height=400,
+                      yaxis_title='Rendimiento (kg/ha)')
+    return fig
+
+@instrumentar('figuras.puntos')
+def figura_puntos(df, respuesta='Rendimiento_kg_ha', max_puntos=MAX_PUNTOS_GRAFICO, semilla=0):
+    """Gráfico de parcelas con dispersión vertical; usa WebGL y una muestra si hay muchos puntos."""
+    import plotly.graph_objects as go
+    
+    rng = np.random.default_rng(semilla)
+    codigos, niveles = codigos_tratamiento(df['Tratamiento'])
+    y = df[respuesta].to_numpy()
+    validos = codigos >= 0
+    if not validos.all():
+        codigos, y = codigos[validos], y[validos]
+    total = len(y)
+    muestreado = total > max_puntos
+    if muestreado:
+        posiciones = np.sort(rng.choice(total, max_puntos, replace=False))
+        codigos, y = codigos[posiciones], y[posiciones]
+    jitter = rng.uniform(-0.3, 0.3, len(y))
+    
+    grande = len(y) > UMBRAL_WEBGL
+    traza = go.Scattergl if grande else go.Scatter
+    fig = go.Figure(traza(
+        x=y, y=codigos + jitter, mode='markers',
+        marker=dict(color=np.asarray(COLORES_TRATAMIENTOS)[codigos % len(COLORES_TRATAMIENTOS)],
+                    size=4 if grande else 7, opacity=0.6)
+    ))
+    titulo = 'Parcelas por Tratamiento'
+    if muestreado:
+        titulo += f' (muestra de {len(y):,} de {total:,})'
+    fig.update_layout(title=titulo, height=max(400, 22 * len(niveles)), xaxis_title=respuesta,
+                      yaxis=dict(tickmode='array', tickvals=list(range(len(niveles))),
+                                 ticktext=[str(t) for t in niveles]))
+    return fig
+
+@instrumentar('figuras.interaccion')
+def figura_interaccion(medias_celda):
+    """Gráfico de interacción: una línea por fertilizante a lo largo de las variedades.
+    
+    Líneas paralelas indican ausencia de interacción; con muchos fertilizantes se omite la leyenda.
+    """
+    import plotly.graph_objects as go
+    
+    fig = go.Figure()
+    variedades = [str(v) for v in medias_celda.columns]
+    for i, (tratamiento, fila) in enumerate(medias_celda.iterrows()):
+        fig.add_trace(go.Scatter(
+            x=variedades, y=fila.to_numpy(), mode='lines+markers', name=str(tratamiento),
+            line=dict(color=COLORES_TRATAMIENTOS[i % len(COLORES_TRATAMIENTOS)])
+        ))
+    fig.update_layout(title='Interacción Fertilizante × Variedad', height=450,
+                      xaxis_title=medias_celda.columns.name, yaxis_title='Rendimiento medio (kg/ha)',
+                      showlegend=len(medias_celda) <= 12)
+    return fig
@@ -0,0 +1,138 @@
+"""ANOVA incremental para la captura de rendimientos parcela a parcela."""
+import numpy as np
+import pandas as pd
+
+from .anova import anova_desde_estadisticos, estadisticos_por_tratamiento
+
+class AnovaIncremental:
+    """Mantiene (n, media, M2) por tratamiento con altas, cambios y bajas O(1).
+    
+    Cada observación se guarda por su ID para poder corregirla o borrarla; la tabla ANOVA,
+    las medias y el mejor tratamiento se recalculan a partir de los k estadísticos, sin
+    volver a recorrer las parcelas.
+    """
+    
+    def __init__(self):
+        self._observaciones = {}
+        self._indice = {}
+        self._tratamientos = []
+        self._n = []
+        self._media = []
+        self._m2 = []
+        self._siguiente_id = 1
+    
+    @classmethod
+    def desde_dataframe(cls, df, respuesta='Rendimiento_kg_ha'):
+        """Carga inicial en bloque; usa la columna ID si existe y si no, el índice."""
+        incremental = cls()
+        niveles, n, medias, m2 = estadisticos_por_tratamiento(df, respuesta)
+        for t in niveles:
+            incremental._nuevo_tratamiento(t)
+        incremental._n, incremental._media, incremental._m2 = n.tolist(), medias.tolist(), m2.tolist()
+        
+        ids = df['ID'] if 'ID' in df.columns else df.index
+        incremental._observaciones = dict(zip(ids, zip(df['Tratamiento'], df[respuesta].astype(float))))
+        incremental._siguiente_id = len(incremental._observaciones) + 1
+        return incremental
+    
+    def __len__(self):
+        return len(self._observaciones)
+    
+    def __contains__(self, id_obs):
+        return id_obs in self._observaciones
+    
+    def _nuevo_tratamiento(self, tratamiento):
+        self._indice[tratamiento] = len(self._tratamientos)
+        self._tratamientos.append(tratamiento)
+        self._n.append(0.0)
+        self._media.append(0.0)
+        self._m2.append(0.0)
+    
+    def _sumar(self, tratamiento, valor):
+        if tratamiento not in self._indice:
+            self._nuevo_tratamiento(tratamiento)
+        i = self._indice[tratamiento]
+        self._n[i] += 1
+        delta = valor - self._media[i]
+        self._media[i] += delta / self._n[i]
+        self._m2[i] += delta * (valor - self._media[i])
+    
+    def _restar(self, tratamiento, valor):
+        i = self._indice[tratamiento]
+        self._n[i] -= 1
+        if self._n[i] == 0:
+            self._media[i] = self._m2[i] = 0.0
+            return
+        delta = valor - self._media[i]
+        self._media[i] -= delta / self._n[i]
+        self._m2[i] = max(self._m2[i] - delta * (valor - self._media[i]), 0.0)
+    
+    def agregar(self, tratamiento, valor, id_obs=None):
+        """Registra una parcela y devuelve su ID (se genera uno si no se indica)."""
+        if id_obs is None:
+            while self._siguiente_id in self._observaciones:
+                self._siguiente_id += 1
+            id_obs = self._siguiente_id
+        if id_obs in self._observaciones:
+            raise KeyError(f"Ya existe una observación con ID {id_obs!r}")
+        valor = float(valor)
+        self._observaciones[id_obs] = (tratamiento, valor)
+        self._sumar(tratamiento, valor)
+        return id_obs
+    
+    def actualizar(self, id_obs, valor=None, tratamiento=None):
+        """Corrige el rendimiento y/o el tratamiento de una parcela ya registrada."""
+        trat_anterior, valor_anterior = self._observaciones[id_obs]
+        nuevo_trat = trat_anterior if tratamiento is None else tratamiento
+        nuevo_valor = valor_anterior if valor is None else float(valor)
+        self._restar(trat_anterior, valor_anterior)
+        self._sumar(nuevo_trat, nuevo_valor)
+        self._observaciones[id_obs] = (nuevo_trat, nuevo_valor)
+    
+    def eliminar(self, id_obs):
+        tratamiento, valor = self._observaciones.pop(id_obs)
+        self._restar(tratamiento, valor)
+    
+    def observacion(self, id_obs):
+        return self._observaciones[id_obs]
+    
+    def ultimas(self, cantidad=20):
+        """Las últimas parcelas registradas (el dict conserva el orden de inserción)."""
+        filas = []
+        for id_obs in reversed(self._observaciones):
+            if len(filas) == cantidad:
+                break
+            tratamiento, valor = self._observaciones[id_obs]
+            filas.append({'ID': id_obs, 'Tratamiento': tratamiento, 'Rendimiento_kg_ha': valor})
+        return pd.DataFrame(filas, columns=['ID', 'Tratamiento', 'Rendimiento_kg_ha'])
+    
+    def _activos(self):
+        n = np.array(self._n)
+        activos = n > 0
+        return (np.asarray(self._tratamientos, dtype=object)[activos], n[activos],
+                np.array(self._media)[activos], np.array(self._m2)[activos])
+    
+    def estadisticas(self):
+        tratamientos, n, medias, m2 = self._activos()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            de = np.sqrt(m2 / (n - 1))
+        return pd.DataFrame({'n': n.astype(np.int64), 'Media': medias, 'DE': de},
+                            index=pd.Index(tratamientos, name='Tratamiento'))
+    
+    def mejor(self):
+        """(tratamiento, media) con el mayor rendimiento medio, o None si no hay datos."""
+        tratamientos, _, medias, _ = self._activos()
+        if len(medias) == 0:
+            return None
+        i = int(np.argmax(medias))
+        return tratamientos[i], float(medias[i])
+    
+    def puede_analizar(self):
+        _, n, _, _ = self._activos()
+        return len(n) >= 2 and n.sum() > len(n)
+    
+    def anova(self):
+        if not self.puede_analizar():
+            raise ValueError("Se necesitan al menos 2 tratamientos y más parcelas que tratamientos")
+        _, n, medias, m2 = self._activos()
+        return anova_desde_estadisticos(n, medias, m2)
@@ -0,0 +1,118 @@
+"""Medición de tiempos por etapa (generación, ANOVA, figuras, exportación, páginas).
+
+Desactivado, cada función instrumentada solo consulta un booleano antes de llamarse. Se
+activa con la variable de entorno DCA_PAPA_PERFIL=1, con `--metricas` en el modo por
+lotes o desde el panel de diagnóstico de la app.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+class Perfilador:
+    """Llamadas, tiempo total, máximo y últimos tiempos de cada etapa (seguro entre hilos)."""
+    
+    def __init__(self, activo=False, historial=50):
+        self.activo = activo
+        self.historial = historial
+        self._etapas = {}
+        self._lock = threading.Lock()
+    
+    def registrar(self, etapa, segundos):
+        with self._lock:
+            datos = self._etapas.get(etapa)
+            if datos is None:
+                datos = self._etapas[etapa] = {'llamadas': 0, 'total': 0.0, 'max': 0.0,
+                                               'ultimos': deque(maxlen=self.historial)}
+            datos['llamadas'] += 1
+            datos['total'] += segundos
+            datos['max'] = max(datos['max'], segundos)
+            datos['ultimos'].append(segundos)
+    
+    @contextmanager
+    def medir(self, etapa):
+        if not self.activo:
+            yield
+            return
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio)
+    
+    def instrumentar(self, etapa):
+        """Decorador que mide cada llamada a la función como `etapa`."""
+        def decorador(funcion):
+            @functools.wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.registrar(etapa, time.perf_counter() - inicio)
+            return envoltura
+        return decorador
+    
+    def limpiar(self):
+        with self._lock:
+            self._etapas.clear()
+    
+    def resumen(self):
+        """Una fila por etapa con tiempos en milisegundos, ordenadas por tiempo total."""
+        with self._lock:
+            filas = [{
+                'Etapa': etapa, 'Llamadas': datos['llamadas'], 'Total ms': datos['total'] * 1000,
+                'Media ms': datos['total'] / datos['llamadas'] * 1000, 'Máx ms': datos['max'] * 1000,
+                'Último ms': datos['ultimos'][-1] * 1000
+            } for etapa, datos in self._etapas.items()]
+        return sorted(filas, key=lambda fila: fila['Total ms'], reverse=True)
+    
+    def a_json(self, extra=None):
+        return json.dumps({'activo': self.activo, 'etapas': self.resumen(), 'memoria': memoria_proceso(),
+                           'extra': extra or {}}, ensure_ascii=False, indent=2)
+    
+    def a_prometheus(self, extra=None, prefijo='dca_papa'):
+        """Formato de texto de Prometheus; `extra` agrega gauges sueltos (nombre → valor)."""
+        lineas = [f"# HELP {prefijo}_etapa_llamadas_total Llamadas medidas por etapa",
+                  f"# TYPE {prefijo}_etapa_llamadas_total counter"]
+        filas = self.resumen()
+        lineas += [f'{prefijo}_etapa_llamadas_total{{etapa="{f["Etapa"]}"}} {f["Llamadas"]}' for f in filas]
+        lineas += [f"# HELP {prefijo}_etapa_segundos_total Tiempo acumulado por etapa",
+                   f"# TYPE {prefijo}_etapa_segundos_total counter"]
+        lineas += [f'{prefijo}_etapa_segundos_total{{etapa="{f["Etapa"]}"}} {f["Total ms"] / 1000:.6f}'
+                   for f in filas]
+        lineas += [f"# HELP {prefijo}_etapa_segundos_max Llamada más lenta por etapa",
+                   f"# TYPE {prefijo}_etapa_segundos_max gauge"]
+        lineas += [f'{prefijo}_etapa_segundos_max{{etapa="{f["Etapa"]}"}} {f["Máx ms"] / 1000:.6f}' for f in filas]
+        gauges = {f'memoria_{clave}': valor for clave, valor in memoria_proceso().items() if valor is not None}
+        gauges.update(extra or {})
+        for nombre, valor in gauges.items():
+            lineas += [f"# TYPE {prefijo}_{nombre} gauge", f"{prefijo}_{nombre} {valor}"]
+        return "\n".join(lineas) + "\n"
+
+def memoria_proceso():
+    """Memoria residente actual (solo Linux) y máxima (Unix) del proceso en bytes."""
+    actual = maxima = None
+    try:
+        with open('/proc/self/statm') as statm:
+            actual = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        maxima = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    except ImportError:
+        pass
+    return {'rss_bytes': actual, 'rss_max_bytes': maxima}
+
+# Perfilador del proceso: lo comparten el paquete, el modo por lotes y todas las sesiones de la app
+PERFILADOR = Perfilador(activo=os.environ.get('DCA_PAPA_PERFIL') == '1')
+instrumentar = PERFILADOR.instrumentar
+medir = PERFILADOR.medir
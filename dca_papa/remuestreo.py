@@ -0,0 +1,124 @@
+"""Pruebas por remuestreo (permutación y bootstrap) para rendimientos no normales."""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from .anova import anova_desde_estadisticos
+from .datos import codigos_tratamiento
+from .perfil import instrumentar
+
+def _ordenar_por_tratamiento(df, respuesta='Rendimiento_kg_ha'):
+    """Códigos y respuestas ordenados para que cada tratamiento ocupe un bloque contiguo."""
+    codigos, niveles = codigos_tratamiento(df['Tratamiento'])
+    orden = np.argsort(codigos, kind='stable')
+    codigos = codigos[orden].astype(np.int64)
+    y = df[respuesta].to_numpy(dtype=np.float64)[orden]
+    n = np.bincount(codigos, minlength=len(niveles)).astype(np.float64)
+    return niveles, codigos, y, n
+
+def _sumas_por_lote(codigos_lote, pesos, k):
+    """Sumas por (réplica, tratamiento) de una matriz réplica × parcela con un solo bincount."""
+    replicas = codigos_lote.shape[0]
+    desplazados = codigos_lote + (np.arange(replicas) * k)[:, None]
+    return np.bincount(desplazados.ravel(), weights=pesos.ravel(), minlength=replicas * k).reshape(replicas, k)
+
+def _permutaciones_lote(inicio, yc, n, q_obs, replicas, semilla):
+    rng = np.random.default_rng(semilla)
+    # Permutar las respuestas equivale a permutar los códigos de tratamiento, y con los grupos
+    # contiguos las sumas por grupo salen de una sola reducción por bloques
+    permutados = rng.permuted(np.broadcast_to(yc, (replicas, yc.size)), axis=1)
+    sumas = np.add.reduceat(permutados, inicio, axis=1)
+    # Con tamaños de grupo fijos, F crece con Σ S_g² / n_g: basta comparar ese término
+    q = (sumas ** 2 / n).sum(axis=1)
+    return int((q >= q_obs * (1 - 1e-12)).sum())
+
+def _bootstrap_lote(codigos, y, n, medias, f_obs, replicas, semilla):
+    rng = np.random.default_rng(semilla)
+    k = len(n)
+    inicio = np.r_[0, np.cumsum(n)[:-1]].astype(np.int64)
+    n_obs = n[codigos].astype(np.int64)
+    idx = inicio[codigos] + rng.integers(0, n_obs, size=(replicas, codigos.size))
+    
+    remuestra = y[idx]
+    medias_boot = _sumas_por_lote(np.broadcast_to(codigos, idx.shape), remuestra, k) / n
+    
+    # Bajo H0 se remuestrean los residuos centrados en su grupo (conserva varianzas desiguales)
+    residuos = remuestra - medias[codigos]
+    sumas = _sumas_por_lote(np.broadcast_to(codigos, idx.shape), residuos, k)
+    sumas2 = _sumas_por_lote(np.broadcast_to(codigos, idx.shape), residuos ** 2, k)
+    total = sumas.sum(axis=1)
+    ss_b = (sumas ** 2 / n).sum(axis=1) - total ** 2 / n.sum()
+    ss_w = sumas2.sum(axis=1) - (sumas ** 2 / n).sum(axis=1)
+    f = (ss_b / (k - 1)) / (ss_w / (n.sum() - k))
+    return int((f >= f_obs).sum()), medias_boot
+
+def _repartir(total, por_lote):
+    return [min(por_lote, total - i) for i in range(0, total, por_lote)]
+
+@instrumentar('remuestreo')
+def anova_remuestreo(df, n_permutaciones=10000, n_bootstrap=2000, nivel=0.95, semilla=2025,
+                     max_elementos=4_000_000, max_trabajadores=None, progreso=None):
+    """P-valores por permutación y bootstrap del ANOVA de una vía e IC bootstrap de las medias.
+    
+    Las réplicas se procesan en lotes réplica × parcela repartidos en un pool de hilos.
+    """
+    niveles, codigos, y, n = _ordenar_por_tratamiento(df)
+    k = len(n)
+    medias = np.bincount(codigos, weights=y, minlength=k) / n
+    yc = y - y.mean()
+    q_obs = (np.bincount(codigos, weights=yc, minlength=k) ** 2 / n).sum()
+    inicio = np.r_[0, np.cumsum(n)[:-1]].astype(np.int64)
+    anova = anova_desde_estadisticos(n, medias, np.bincount(codigos, weights=(y - medias[codigos]) ** 2, minlength=k))
+    
+    por_lote = max(1, max_elementos // len(y))
+    lotes_perm = _repartir(n_permutaciones, por_lote)
+    lotes_boot = _repartir(n_bootstrap, max(1, por_lote // 4))
+    semillas = np.random.SeedSequence(semilla).spawn(len(lotes_perm) + len(lotes_boot))
+    
+    extremos_perm = extremos_boot = 0
+    medias_boot = [None] * len(lotes_boot)
+    total_tareas = len(semillas)
+    inicio_reloj = time.perf_counter()
+    
+    with ThreadPoolExecutor(max_workers=max_trabajadores or os.cpu_count()) as pool:
+        futuros = {}
+        for reps, sem in zip(lotes_perm, semillas):
+            futuros[pool.submit(_permutaciones_lote, inicio, yc, n, q_obs, reps, sem)] = ('perm', None)
+        for i, (reps, sem) in enumerate(zip(lotes_boot, semillas[len(lotes_perm):])):
+            futuros[pool.submit(_bootstrap_lote, codigos, y, n, medias, anova['F'], reps, sem)] = ('boot', i)
+        
+        for hechos, futuro in enumerate(as_completed(futuros), start=1):
+            tipo, i = futuros[futuro]
+            if tipo == 'perm':
+                extremos_perm += futuro.result()
+            else:
+                extremos, medias_boot[i] = futuro.result()
+                extremos_boot += extremos
+            if progreso is not None:
+                transcurrido = time.perf_counter() - inicio_reloj
+                progreso(hechos / total_tareas, transcurrido / hechos * (total_tareas - hechos))
+    
+    cola = (1 - nivel) / 2
+    limites = np.quantile(np.vstack(medias_boot), [cola, 1 - cola], axis=0)
+    intervalos = pd.DataFrame({
+        'Tratamiento': list(niveles), 'n': n.astype(np.int64), 'Media': medias,
+        'IC inferior': limites[0], 'IC superior': limites[1]
+    })
+    return {
+        'F': anova['F'], 'P_parametrico': anova['P'],
+        'P_permutacion': (extremos_perm + 1) / (n_permutaciones + 1),
+        'P_bootstrap': (extremos_boot + 1) / (n_bootstrap + 1),
+        'n_permutaciones': n_permutaciones, 'n_bootstrap': n_bootstrap, 'nivel': nivel,
+        'intervalos': intervalos
+    }
+
+def medias_por_lote(df, respuesta='Rendimiento_kg_ha'):
+    """Reduce un diseño con submuestreo a la media de cada lote (la unidad experimental).
+    
+    `respuesta` puede ser una columna o una lista de columnas.
+    """
+    return (df.groupby(['Tratamiento', 'Lote'], observed=True, sort=False)[respuesta]
+              .mean().reset_index())
@@ -0,0 +1,51 @@
+"""Cola de trabajos en segundo plano compartida por todas las sesiones."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class ColaTrabajos:
+    """Pool de hilos con fusión de trabajos en curso por clave.
+    
+    Si dos sesiones piden el mismo trabajo (misma clave) mientras el primero sigue en curso,
+    ambas reciben el mismo Future y el cálculo se hace una sola vez. Los trabajos no deben
+    esperar a otros trabajos de la misma cola: con pocos hilos eso puede bloquearla.
+    """
+    
+    def __init__(self, max_trabajadores=None):
+        self._pool = ThreadPoolExecutor(max_workers=max_trabajadores, thread_name_prefix='dca_papa')
+        self.max_trabajadores = self._pool._max_workers
+        self._en_curso = {}
+        self._lock = threading.Lock()
+        self.enviados = 0
+        self.fusionados = 0
+    
+    def enviar(self, clave, funcion, *args, **kwargs):
+        """Devuelve el Future del trabajo `clave`, creándolo solo si no hay uno en curso."""
+        with self._lock:
+            futuro = self._en_curso.get(clave)
+            if futuro is not None:
+                self.fusionados += 1
+                return futuro
+            futuro = self._pool.submit(funcion, *args, **kwargs)
+            self._en_curso[clave] = futuro
+            self.enviados += 1
+        futuro.add_done_callback(lambda terminado: self._terminar(clave, terminado))
+        return futuro
+    
+    def _terminar(self, clave, futuro):
+        with self._lock:
+            if self._en_curso.get(clave) is futuro:
+                del self._en_curso[clave]
+    
+    def en_curso(self, clave):
+        with self._lock:
+            return clave in self._en_curso
+    
+    def estadisticas(self):
+        with self._lock:
+            return {
+                'en_curso': len(self._en_curso), 'trabajadores': self.max_trabajadores,
+                'enviados': self.enviados, 'fusionados': self.fusionados
+            }
+    
+    def cerrar(self, esperar=True):
+        self._pool.shutdown(wait=esperar)
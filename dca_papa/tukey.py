@@ -0,0 +1,99 @@
+"""Prueba de Tukey HSD (Tukey-Kramer para modelos no balanceados)."""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .anova import estadisticos_por_tratamiento
+from .perfil import instrumentar
+
+@lru_cache(maxsize=512)
+def q_critico_tukey(k, df_error, alfa=0.05):
+    """Valor crítico del rango estudentizado, calculado una vez por (k, gl_error, alfa)."""
+    from scipy import stats
+    
+    return float(stats.studentized_range.ppf(1 - alfa, k, df_error))
+
+def letras_grupo(indice):
+    """a, b, ..., z, A, ..., Z y luego a1, b1, ... para diseños con muchos grupos."""
+    alfabeto = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    vuelta, pos = divmod(indice, len(alfabeto))
+    return alfabeto[pos] + (str(vuelta) if vuelta else "")
+
+def _bits(conjunto):
+    while conjunto:
+        bajo = conjunto & -conjunto
+        yield bajo.bit_length() - 1
+        conjunto ^= bajo
+
+def letras_compactas(significativo, orden):
+    """Letras de grupo a partir de la matriz completa de comparaciones significativas.
+    
+    Cada letra es un conjunto maximal de tratamientos sin diferencias significativas entre
+    sí, lo mismo que deja la inserción-absorción de Piepho (2004); con Tukey-Kramer no
+    balanceado no tienen por qué ser rachas contiguas de medias ordenadas. Los conjuntos son
+    las cliques maximales del grafo de pares no significativos (Bron-Kerbosch con pivote,
+    con enteros como conjuntos de bits) y se ordenan según su primera media en `orden`.
+    """
+    k = len(significativo)
+    iguales = ~np.asarray(significativo, dtype=bool)
+    np.fill_diagonal(iguales, False)
+    vecinos = [sum(1 << int(v) for v in np.flatnonzero(fila)) for fila in iguales]
+    
+    cliques = []
+    pendientes = [(0, (1 << k) - 1, 0)]
+    while pendientes:
+        clique, candidatos, excluidos = pendientes.pop()
+        if not candidatos:
+            if not excluidos:
+                cliques.append(clique)
+            continue
+        pivote = max(_bits(candidatos | excluidos), key=lambda u: (candidatos & vecinos[u]).bit_count())
+        for v in _bits(candidatos & ~vecinos[pivote]):
+            pendientes.append((clique | 1 << v, candidatos & vecinos[v], excluidos & vecinos[v]))
+            candidatos &= ~(1 << v)
+            excluidos |= 1 << v
+    
+    posicion = np.empty(k, dtype=np.int64)
+    posicion[orden] = np.arange(k)
+    miembros = [sorted(posicion[list(_bits(clique))]) for clique in cliques]
+    letras = ["" for _ in range(k)]
+    for g, grupo in enumerate(sorted(miembros)):
+        for pos in grupo:
+            letras[orden[pos]] += letras_grupo(g)
+    return letras
+
+def tukey_desde_estadisticos(niveles, n, medias, ms_within, df_within, alfa=0.05):
+    niveles = np.asarray(list(niveles), dtype=object)
+    n = np.asarray(n, dtype=np.float64)
+    medias = np.asarray(medias, dtype=np.float64)
+    k = len(medias)
+    q_crit = q_critico_tukey(k, df_within, alfa)
+    
+    # Todas las comparaciones a la vez como matrices k×k
+    diferencias = medias[:, None] - medias[None, :]
+    ee = np.sqrt(ms_within / 2.0 * (1.0 / n[:, None] + 1.0 / n[None, :]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = np.abs(diferencias) / ee
+    significativo = q > q_crit
+    
+    i, j = np.triu_indices(k, 1)
+    comparaciones = pd.DataFrame({
+        'Trat. A': niveles[i], 'Trat. B': niveles[j],
+        'Diferencia': diferencias[i, j], 'EE': ee[i, j], 'q': q[i, j],
+        'HSD': q_crit * ee[i, j], 'Significativo': significativo[i, j]
+    })
+    
+    orden = np.argsort(-medias, kind='stable')
+    letras = letras_compactas(significativo, orden)
+    
+    grupos = pd.DataFrame({
+        'Tratamiento': niveles[orden], 'n': n[orden].astype(np.int64),
+        'Media': medias[orden], 'Grupo': [letras[t] for t in orden]
+    })
+    return {'q_critico': q_crit, 'alfa': alfa, 'comparaciones': comparaciones, 'grupos': grupos}
+
+@instrumentar('tukey')
+def calcular_tukey(df, anova, alfa=0.05):
+    niveles, n, medias, _ = estadisticos_por_tratamiento(df)
+    return tukey_desde_estadisticos(niveles, n, medias, anova['MS_W'], anova['DF_W'], alfa)
@@ -0,0 +1,45 @@
+import sqlite3
+
+from dca_papa import almacen
+from dca_papa.almacen import AlmacenResultados
+
+def test_guarda_y_recupera(tmp_path):
+    ruta = tmp_path / 'r.sqlite'
+    AlmacenResultados(ruta).obtener(('anova', 1), lambda: {'F': 3.5})
+    # Otra instancia (otro proceso) encuentra el resultado sin recalcular
+    assert AlmacenResultados(ruta).obtener(('anova', 1), lambda: 1 / 0) == {'F': 3.5}
+
+def test_ruta_inutilizable_calcula_sin_almacen(tmp_path):
+    archivo = tmp_path / 'no_es_directorio'
+    archivo.write_text('')
+    a = AlmacenResultados(archivo / 'r.sqlite')
+    assert not a.disponible
+    assert a.obtener(('x',), lambda: 42) == 42
+    assert a.estadisticas()['entradas'] == 0
+
+def test_errores_de_sqlite_no_interrumpen_el_calculo(tmp_path):
+    a = AlmacenResultados(tmp_path / 'r.sqlite')
+    
+    def fallar():
+        raise sqlite3.DataError("string or blob too big")
+    a._conectar = fallar
+    assert a.obtener(('x',), lambda: 7) == 7
+
+def test_blob_demasiado_grande_no_se_guarda(tmp_path, monkeypatch):
+    monkeypatch.setattr(almacen, 'MAX_BYTES_ENTRADA', 1000)
+    a = AlmacenResultados(tmp_path / 'r.sqlite')
+    assert a.obtener(('grande',), lambda: b'x' * 5000) == b'x' * 5000
+    assert a.estadisticas()['entradas'] == 0
+
+def test_directorio_nuevo_es_privado(tmp_path):
+    a = AlmacenResultados(tmp_path / 'privado' / 'r.sqlite')
+    assert a.disponible
+    assert (tmp_path / 'privado').stat().st_mode & 0o777 == 0o700
+
+def test_rechaza_directorio_escribible_por_otros(tmp_path):
+    compartido = tmp_path / 'compartido'
+    compartido.mkdir()
+    compartido.chmod(0o777)
+    a = AlmacenResultados(compartido / 'r.sqlite')
+    assert not a.disponible
+    assert a.obtener(('x',), lambda: 1) == 1
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from dca_papa.anova import (anova_multirespuesta, anova_multirespuesta_anidado, calcular_anova_anidado,
+                            calcular_anova_simple)
+from dca_papa.datos import CONFIGS_MODELOS, generar_datos_modelo, obtener_datos_modelo
+
+def anova_referencia(df):
+    """Implementación original: un grupo por tratamiento, f_oneway y SC por grupo."""
+    grupos = [df[df['Tratamiento'] == t]['Rendimiento_kg_ha'].values
+              for t in df['Tratamiento'].unique()]
+    f_stat, p_value = stats.f_oneway(*grupos)
+    
+    n_total = len(df)
+    k = len(df['Tratamiento'].unique())
+    grand_mean = df['Rendimiento_kg_ha'].mean()
+    
+    ss_total = ((df['Rendimiento_kg_ha'] - grand_mean) ** 2).sum()
+    ss_between = sum([len(df[df['Tratamiento'] == t]) *
+                      (df[df['Tratamiento'] == t]['Rendimiento_kg_ha'].mean() - grand_mean) ** 2
+                      for t in df['Tratamiento'].unique()])
+    ss_within = ss_total - ss_between
+    return {
+        'F': f_stat, 'P': p_value, 'SS_B': ss_between, 'SS_W': ss_within, 'SS_T': ss_total,
+        'DF_B': k - 1, 'DF_W': n_total - k,
+        'MS_B': ss_between / (k - 1), 'MS_W': ss_within / (n_total - k)
+    }
+
+def comparar(df, rel=1e-9):
+    resultado = calcular_anova_simple(df)
+    referencia = anova_referencia(df)
+    assert resultado.keys() == referencia.keys()
+    for clave, esperado in referencia.items():
+        assert resultado[clave] == pytest.approx(esperado, rel=rel), clave
+
+def test_balanceado():
+    comparar(generar_datos_modelo(*CONFIGS_MODELOS[1]))
+
+def test_no_balanceado():
+    comparar(generar_datos_modelo(*CONFIGS_MODELOS[2]))
+
+def test_categoria_sin_parcelas():
+    df = generar_datos_modelo(*CONFIGS_MODELOS[2])
+    df['Tratamiento'] = df['Tratamiento'].cat.add_categories(['T5'])
+    comparar(df)
+    assert calcular_anova_simple(df)['DF_B'] == 3
+
+def test_tratamientos_como_texto_y_valores_grandes():
+    # Medias altas y DE pequeña: la referencia pierde dígitos por cancelación, de ahí la tolerancia
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({'Tratamiento': np.repeat(['A', 'B', 'C'], [5, 9, 13]),
+                       'Rendimiento_kg_ha': 1e7 + rng.normal(0, 3, 27) + np.repeat([0, 2, 5], [5, 9, 13])})
+    comparar(df, rel=1e-6)
+
+def _comparar_multirespuesta(df, tabla, anova_por_columna):
+    for fila in tabla.itertuples(index=False):
+        anova = anova_por_columna(fila.Respuesta)
+        for columna, clave in [('SC_Trat', 'SS_B'), ('SC_Error', 'SS_W'), ('CM_Trat', 'MS_B'),
+                               ('CM_Error', 'MS_W'), ('F', 'F'), ('P', 'P')]:
+            assert getattr(fila, columna) == pytest.approx(anova[clave], rel=1e-9), (fila.Respuesta, columna)
+        assert (fila.GL_Trat, fila.GL_Error) == (anova['DF_B'], anova['DF_W'])
+
+def test_multirespuesta_coincide_con_anova_simple_por_columna():
+    df = obtener_datos_modelo(2)
+    rng = np.random.default_rng(3)
+    # Faltantes distintos en cada columna; en Almidon_pct un tratamiento queda sin datos
+    df.loc[rng.random(len(df)) < 0.2, 'Tuberculos_por_planta'] = np.nan
+    df.loc[rng.random(len(df)) < 0.05, 'Materia_seca_pct'] = np.nan
+    df.loc[df['Tratamiento'] == 'T2', 'Almidon_pct'] = np.nan
+    respuestas = list(df.select_dtypes('number').columns)
+    
+    def anova_columna(respuesta):
+        datos = df[['Tratamiento', respuesta]].dropna()
+        return calcular_anova_simple(datos.rename(columns={respuesta: 'Rendimiento_kg_ha'}))
+    
+    tabla, medias = anova_multirespuesta(df, respuestas)
+    _comparar_multirespuesta(df, tabla, anova_columna)
+    assert tabla.set_index('Respuesta').loc['Almidon_pct', 'GL_Trat'] == 2
+    assert np.isnan(medias.loc['T2', 'Almidon_pct'])
+    esperadas = df.groupby('Tratamiento', observed=True)[respuestas].mean()
+    np.testing.assert_allclose(medias.to_numpy(), esperadas.to_numpy(), rtol=1e-9)
+
+@pytest.mark.parametrize('numero', [3, 4, 5])
+def test_multirespuesta_anidado_coincide_con_anova_anidado(numero):
+    df = obtener_datos_modelo(numero)
+    tabla, _ = anova_multirespuesta_anidado(df)
+    _comparar_multirespuesta(df, tabla, lambda respuesta: calcular_anova_anidado(df, respuesta))
+
+def anova_anidado_referencia(df, respuesta='Rendimiento_kg_ha'):
+    """Descomposición por groupby: tratamientos, lotes dentro de tratamiento y submuestras."""
+    df = df.dropna(subset=['Tratamiento', 'Lote'])
+    y = df[respuesta]
+    media_t = df.groupby('Tratamiento', observed=True)[respuesta].transform('mean')
+    media_l = df.groupby(['Tratamiento', 'Lote'], observed=True)[respuesta].transform('mean')
+    k = df['Tratamiento'].nunique()
+    lotes = df.groupby(['Tratamiento', 'Lote'], observed=True).ngroups
+    return {
+        'SS_B': ((media_t - y.mean()) ** 2).sum(), 'SS_W': ((media_l - media_t) ** 2).sum(),
+        'SS_S': ((y - media_l) ** 2).sum(), 'DF_B': k - 1, 'DF_W': lotes - k, 'DF_S': len(df) - lotes
+    }
+
+def comparar_anidado(df):
+    resultado = calcular_anova_anidado(df)
+    for clave, esperado in anova_anidado_referencia(df).items():
+        assert resultado[clave] == pytest.approx(esperado, rel=1e-9), clave
+    assert resultado['F'] == pytest.approx(resultado['MS_B'] / resultado['MS_W'])
+
+@pytest.mark.parametrize('numero', [3, 4, 5])
+def test_anidado_coincide_con_groupby(numero):
+    comparar_anidado(obtener_datos_modelo(numero))
+
+def test_anidado_con_tratamiento_faltante():
+    df = obtener_datos_modelo(4)
+    df.loc[[0, 7], 'Tratamiento'] = np.nan
+    comparar_anidado(df)
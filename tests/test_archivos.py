@@ -0,0 +1,71 @@
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from dca_papa.archivos import anova_por_bloques
+
+def _datos_codigos_enteros():
+    # Tratamientos 1-4 como enteros, con un faltante que hace que su bloque se lea como float
+    rng = np.random.default_rng(4)
+    tratamiento = np.repeat([1, 2, 3, 4], 10).astype(object)
+    tratamiento[15] = None
+    rendimiento = rng.normal(30000, 2000, 40).round(1) + np.repeat([0, 1500, 3000, 500], 10)
+    return pd.DataFrame({'Tratamiento': tratamiento, 'Rendimiento_kg_ha': rendimiento})
+
+def _anova_referencia(df):
+    df = df.dropna()
+    grupos = [g['Rendimiento_kg_ha'].to_numpy() for _, g in df.groupby(df['Tratamiento'].astype(int))]
+    return stats.f_oneway(*grupos)
+
+def test_csv_codigos_enteros_con_faltantes_en_bloques(tmp_path):
+    df = _datos_codigos_enteros()
+    ruta = tmp_path / 'campo.csv'
+    df.to_csv(ruta, index=False)
+    
+    anova, resumen = anova_por_bloques(ruta, 'csv', tamano_bloque=10)
+    referencia = _anova_referencia(df)
+    
+    assert list(resumen.index) == ['1', '2', '3', '4']
+    assert resumen['n'].sum() == 39
+    assert anova['F'] == pytest.approx(referencia.statistic)
+    assert anova['P'] == pytest.approx(referencia.pvalue)
+
+@pytest.mark.parametrize('tipo', ['int', 'category'])
+def test_parquet_tratamiento_como_texto(tmp_path, tipo):
+    pytest.importorskip('pyarrow')
+    df = _datos_codigos_enteros().dropna()
+    df['Tratamiento'] = df['Tratamiento'].astype(int).astype(tipo)
+    ruta = tmp_path / 'campo.parquet'
+    df.to_parquet(ruta, index=False)
+    
+    anova, resumen = anova_por_bloques(ruta, 'parquet', tamano_bloque=7)
+    
+    assert sorted(resumen.index) == ['1', '2', '3', '4']
+    assert anova['F'] == pytest.approx(_anova_referencia(df).statistic)
+
+def test_csv_rendimiento_no_numerico_se_descarta(tmp_path):
+    df = _datos_codigos_enteros().dropna()
+    df['Rendimiento_kg_ha'] = df['Rendimiento_kg_ha'].astype(object)
+    df.iloc[3, 1] = 'x'
+    ruta = tmp_path / 'campo.csv'
+    df.to_csv(ruta, index=False)
+    
+    anova, resumen = anova_por_bloques(ruta, 'csv', tamano_bloque=10)
+    
+    validos = df.drop(index=df.index[3]).astype({'Rendimiento_kg_ha': float})
+    assert resumen['n'].sum() == len(validos)
+    assert anova['F'] == pytest.approx(_anova_referencia(validos).statistic)
+
+def test_csv_gz_subido_como_buffer():
+    df = _datos_codigos_enteros().dropna()
+    buffer = io.BytesIO(gzip.compress(df.to_csv(index=False).encode()))
+    buffer.name = 'cosecha.csv.gz'  # como un UploadedFile de Streamlit
+    
+    anova, resumen = anova_por_bloques(buffer, 'csv', tamano_bloque=10)
+    
+    assert resumen['n'].sum() == len(df)
+    assert anova['F'] == pytest.approx(_anova_referencia(df).statistic)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dca_papa.bifactorial import calcular_anova_bifactorial
+from dca_papa.datos import CONFIGS_BIFACTORIAL, generar_datos_bifactorial
+
+def anova_fuerza_bruta(df, tipo):
+    """SC por diferencia de sumas de cuadrados residuales con la matriz de diseño completa."""
+    A = pd.get_dummies(df['Tratamiento']).to_numpy(dtype=float)
+    B = pd.get_dummies(df['Variedad']).to_numpy(dtype=float)
+    y = df['Rendimiento_kg_ha'].to_numpy(dtype=float)
+    # Codificación de efectos (suma cero), necesaria para que el tipo III sea el de SAS/R
+    eA = A[:, :-1] - A[:, [-1]]
+    eB = B[:, :-1] - B[:, [-1]]
+    AB = (eA[:, :, None] * eB[:, None, :]).reshape(len(y), -1)
+    uno = np.ones((len(y), 1))
+    
+    def rss(*bloques):
+        X = np.hstack(bloques)
+        beta = np.linalg.lstsq(X, y, rcond=None)[0]
+        return ((y - X @ beta) ** 2).sum()
+    
+    completo = rss(uno, eA, eB, AB)
+    if tipo == 1:
+        ss_a, ss_b = rss(uno) - rss(uno, eA), rss(uno, eA) - rss(uno, eA, eB)
+        ss_ab = rss(uno, eA, eB) - completo
+    elif tipo == 2:
+        ss_a = rss(uno, eB) - rss(uno, eA, eB)
+        ss_b = rss(uno, eA) - rss(uno, eA, eB)
+        ss_ab = rss(uno, eA, eB) - completo
+    else:
+        ss_a, ss_b = rss(uno, eB, AB) - completo, rss(uno, eA, AB) - completo
+        ss_ab = rss(uno, eA, eB) - completo
+    return {'SS_A': ss_a, 'SS_B': ss_b, 'SS_AB': ss_ab, 'SS_E': completo}
+
+def comparar(df, tipo):
+    resultado = calcular_anova_bifactorial(df, tipo=tipo)
+    for clave, esperado in anova_fuerza_bruta(df, tipo).items():
+        assert resultado[clave] == pytest.approx(esperado, rel=1e-8), clave
+
+@pytest.mark.parametrize('tipo', [1, 2, 3])
+@pytest.mark.parametrize('nombre', list(CONFIGS_BIFACTORIAL))
+def test_configuraciones(nombre, tipo):
+    semilla, medias, efectos, desv, n_celda, desv_interaccion = CONFIGS_BIFACTORIAL[nombre]
+    comparar(generar_datos_bifactorial(semilla, medias, efectos, desv, n_celda, desv_interaccion), tipo)
+
+def celda_vacia():
+    semilla, medias, efectos, desv, _, desv_interaccion = next(iter(CONFIGS_BIFACTORIAL.values()))
+    n_celda = np.full((len(medias), len(efectos)), 4)
+    n_celda[1, 2] = 0
+    return generar_datos_bifactorial(semilla, medias, efectos, desv, n_celda, desv_interaccion)
+
+@pytest.mark.parametrize('tipo', [1, 2])
+def test_celda_vacia(tipo):
+    df = celda_vacia()
+    comparar(df, tipo)
+    resultado = calcular_anova_bifactorial(df, tipo=tipo)
+    a, b = df['Tratamiento'].nunique(), df['Variedad'].nunique()
+    assert resultado['DF_AB'] == (a - 1) * (b - 1) - 1
+    assert resultado['DF_E'] == len(df) - (a * b - 1)
+
+def test_celda_vacia_tipo3():
+    with pytest.raises(ValueError):
+        calcular_anova_bifactorial(celda_vacia(), tipo=3)
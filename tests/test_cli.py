@@ -0,0 +1,29 @@
+import json
+
+import pytest
+
+from dca_papa.cli import crear_parser, main
+
+@pytest.mark.parametrize('argv', [
+    ['--json', '--tiempos', '--metricas', 'json', 'modelos', '1'],
+    ['modelos', '1', '--json', '--tiempos', '--metricas', 'json'],
+    ['archivo', 'cosecha.parquet', '--json', '--tiempos', '--metricas', 'json'],
+])
+def test_opciones_comunes_antes_o_despues_del_subcomando(argv):
+    args = crear_parser().parse_args(argv)
+    assert args.json and args.tiempos and args.metricas == 'json'
+
+def test_opciones_comunes_por_defecto():
+    args = crear_parser().parse_args(['modelos', '1'])
+    assert not args.json and not args.tiempos and args.metricas is None
+
+def test_json_despues_del_subcomando(capsys):
+    assert main(['modelos', '1', '--json']) == 0
+    filas = json.loads(capsys.readouterr().out)
+    assert [fila['Modelo'] for fila in filas] == ['M1']
+
+def test_archivo_sin_resultados_no_imprime_tabla_vacia(tmp_path, capsys):
+    assert main(['archivo', str(tmp_path / 'no_existe.csv')]) == 1
+    salida = capsys.readouterr()
+    assert salida.out == ''
+    assert 'no_existe.csv' in salida.err
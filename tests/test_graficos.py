@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from dca_papa.datos import CONFIGS_MODELOS, generar_datos_modelo
+from dca_papa.graficos import figura_puntos, resumen_cajas
+
+def _con_tratamiento_faltante():
+    df = generar_datos_modelo(*CONFIGS_MODELOS[2])
+    df.loc[5, 'Tratamiento'] = np.nan
+    return df
+
+def test_resumen_cajas_ignora_tratamientos_faltantes():
+    df = _con_tratamiento_faltante()
+    resumen, _ = resumen_cajas(df)
+    
+    esperado = df.dropna().groupby('Tratamiento', observed=True)['Rendimiento_kg_ha']
+    assert list(resumen['n']) == list(esperado.size())
+    np.testing.assert_allclose(resumen['Media'], esperado.mean())
+    np.testing.assert_allclose(resumen['Mediana'], esperado.median())
+
+def test_figura_puntos_ignora_tratamientos_faltantes():
+    pytest.importorskip('plotly')
+    df = _con_tratamiento_faltante()
+    traza = figura_puntos(df).data[0]
+    assert len(traza.x) == len(df) - 1
+    assert min(traza.y) > -0.5
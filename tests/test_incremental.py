@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dca_papa.anova import calcular_anova_simple
+from dca_papa.datos import obtener_datos_modelo
+from dca_papa.incremental import AnovaIncremental
+
+def comparar(incremental, filas):
+    df = pd.DataFrame(list(filas.values()), columns=['Tratamiento', 'Rendimiento_kg_ha'])
+    referencia = calcular_anova_simple(df)
+    resultado = incremental.anova()
+    for clave, esperado in referencia.items():
+        assert resultado[clave] == pytest.approx(esperado, rel=1e-7, abs=1e-6), clave
+    esperadas = df.groupby('Tratamiento')['Rendimiento_kg_ha'].agg(['size', 'mean'])
+    estadisticas = incremental.estadisticas().sort_index()
+    assert list(estadisticas['n']) == list(esperadas['size'])
+    np.testing.assert_allclose(estadisticas['Media'], esperadas['mean'], rtol=1e-9)
+
+def test_secuencia_aleatoria_de_altas_cambios_y_bajas():
+    rng = np.random.default_rng(11)
+    tratamientos = ['T1', 'T2', 'T3', 'T4', 'T5']
+    incremental = AnovaIncremental.desde_dataframe(obtener_datos_modelo(2))
+    filas = dict(zip(range(len(incremental)), (incremental.observacion(i) for i in range(len(incremental)))))
+    
+    for paso in range(2000):
+        accion = rng.random()
+        if accion < 0.4 or len(filas) < 10:
+            t = str(rng.choice(tratamientos))
+            valor = rng.normal(30000, 2500)
+            filas[incremental.agregar(t, valor)] = (t, valor)
+        elif accion < 0.7:
+            id_obs = list(filas)[rng.integers(len(filas))]
+            t = str(rng.choice(tratamientos)) if rng.random() < 0.5 else None
+            valor = rng.normal(30000, 2500) if t is None or rng.random() < 0.5 else None
+            incremental.actualizar(id_obs, valor, t)
+            filas[id_obs] = (t or filas[id_obs][0], filas[id_obs][1] if valor is None else valor)
+        else:
+            id_obs = list(filas)[rng.integers(len(filas))]
+            incremental.eliminar(id_obs)
+            del filas[id_obs]
+        if paso % 100 == 0 or paso == 1999:
+            comparar(incremental, filas)
+
+def test_tratamiento_vaciado_deja_de_contar():
+    incremental = AnovaIncremental()
+    ids = [incremental.agregar(t, v) for t, v in [('A', 10), ('A', 12), ('B', 20), ('B', 23), ('C', 5)]]
+    incremental.eliminar(ids[-1])
+    assert list(incremental.estadisticas().index) == ['A', 'B']
+    comparar(incremental, {i: incremental.observacion(i) for i in ids[:-1]})
+    with pytest.raises(KeyError):
+        incremental.agregar('A', 1.0, id_obs=ids[0])
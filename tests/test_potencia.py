@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from dca_papa.potencia import escalar_diferencias, simular_potencia
+
+def potencia_analitica(medias, desv, n, alfa=0.05):
+    """Potencia exacta del ANOVA de una vía balanceado con F no central."""
+    mu = np.array(list(medias.values()))
+    k = len(mu)
+    no_centralidad = n * ((mu - mu.mean()) ** 2).sum() / desv ** 2
+    f_critico = stats.f.isf(alfa, k - 1, k * (n - 1))
+    return stats.ncf.sf(f_critico, k - 1, k * (n - 1), no_centralidad)
+
+@pytest.mark.parametrize('factor', [0.5, 1.0])
+def test_coincide_con_f_no_central(factor):
+    medias = escalar_diferencias({'T1': 30000, 'T2': 31500, 'T3': 32000, 'T4': 33000}, factor)
+    desv = 2500
+    tamanos_n = [3, 5, 8, 12]
+    replicas = 4000
+    
+    resultado = simular_potencia(medias, dict.fromkeys(medias, desv), tamanos_n, n_replicas=replicas,
+                                 max_elementos=50_000, max_trabajadores=2)
+    
+    for n, potencia in zip(resultado['n'], resultado['Potencia']):
+        esperada = potencia_analitica(medias, desv, n)
+        # Cuatro errores estándar de Monte Carlo
+        assert potencia == pytest.approx(esperada, abs=4 * np.sqrt(esperada * (1 - esperada) / replicas) + 1e-3)
+
+def test_sin_diferencias_rechaza_alfa():
+    medias = dict.fromkeys(['T1', 'T2', 'T3'], 30000.0)
+    resultado = simular_potencia(medias, dict.fromkeys(medias, 2500), [4], n_replicas=20000)
+    assert resultado['Potencia'].iloc[0] == pytest.approx(0.05, abs=0.01)
+
+def test_reproducible_con_la_misma_semilla():
+    medias = {'T1': 30000, 'T2': 32000, 'T3': 31000}
+    desv = dict.fromkeys(medias, 2500)
+    a = simular_potencia(medias, desv, [4, 6], n_replicas=1000, semilla=7, max_elementos=3000)
+    b = simular_potencia(medias, desv, [4, 6], n_replicas=1000, semilla=7, max_elementos=3000, max_trabajadores=1)
+    assert a.equals(b)
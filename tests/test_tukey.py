@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from dca_papa.anova import calcular_anova
+from dca_papa.datos import CONFIGS_MODELOS, generar_datos_modelo
+from dca_papa.tukey import letras_compactas, tukey_desde_estadisticos, calcular_tukey
+
+@pytest.mark.parametrize('numero', [1, 2])
+def test_coincide_con_scipy(numero):
+    df = generar_datos_modelo(*CONFIGS_MODELOS[numero])
+    anova = calcular_anova(df)
+    tukey = calcular_tukey(df, anova)
+    
+    niveles = list(df['Tratamiento'].cat.categories)
+    grupos = [df.loc[df['Tratamiento'] == t, 'Rendimiento_kg_ha'].to_numpy() for t in niveles]
+    referencia = stats.tukey_hsd(*grupos)
+    intervalo = referencia.confidence_interval(0.95)
+    k, df_error = len(niveles), anova['DF_W']
+    
+    for fila in tukey['comparaciones'].itertuples(index=False):
+        i, j = niveles.index(fila[0]), niveles.index(fila[1])
+        assert fila.Diferencia == pytest.approx(referencia.statistic[i, j], rel=1e-9)
+        # El p-valor de scipy es la cola del rango estudentizado en q
+        assert stats.studentized_range.sf(fila.q, k, df_error) == pytest.approx(referencia.pvalue[i, j], abs=1e-6)
+        assert fila.HSD == pytest.approx(intervalo.high[i, j] - referencia.statistic[i, j], rel=1e-6)
+        assert fila.Significativo == (referencia.pvalue[i, j] < 0.05)
+
+def test_letras_no_balanceado_respetan_las_comparaciones():
+    # A-B es significativo, pero C (n=2) no difiere de ninguno aunque esté lejos de A
+    tukey = tukey_desde_estadisticos(['A', 'B', 'C'], [100, 100, 2], [10, 8, 7.5], 4.0, 200)
+    letras = dict(zip(tukey['grupos']['Tratamiento'], tukey['grupos']['Grupo']))
+    assert letras == {'A': 'a', 'B': 'b', 'C': 'ab'}
+    for fila in tukey['comparaciones'].itertuples(index=False):
+        comparten = bool(set(letras[fila[0]]) & set(letras[fila[1]]))
+        assert comparten != fila.Significativo
+
+def test_letras_aleatorias_coinciden_con_la_matriz():
+    rng = np.random.default_rng(5)
+    for _ in range(200):
+        k = rng.integers(2, 9)
+        significativo = np.triu(rng.random((k, k)) < 0.4, 1)
+        significativo = significativo | significativo.T
+        letras = letras_compactas(significativo, np.arange(k))
+        for i in range(k):
+            for j in range(i + 1, k):
+                assert bool(set(letras[i]) & set(letras[j])) != significativo[i, j]